@@ -7,13 +7,21 @@ Provides REST endpoints for the React frontend
 import os
 import json
 import sys
+import re
+import asyncio
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
 from pathlib import Path
 from datetime import datetime
 from flask import Flask, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import traceback
 
-# Import existing generator components
+# Import existing generator components (importing app also loads .env)
 from app import (
     BusinessInfo,
     BusinessAnalysisAgent,
@@ -21,8 +29,11 @@ from app import (
     ContentAgent,
     ImageAgent,
     HTMLAgent,
-    TemplateLoader
+    TemplateLoader,
+    precompress_file,
+    generate_website_async
 )
+from response_cache import caching_enabled, without_cached_responses
 
 try:
     import google.generativeai as genai
@@ -31,14 +42,78 @@ except ImportError:
     sys.exit(1)
 
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    # orjson serializes the large /api/generate responses (full HTML + agent output) faster
+    import orjson
 except ImportError:
-    pass
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (handles dataclasses and datetimes natively)."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+# One long-lived event loop runs the async agent pipeline for every request:
+# Gemini's async client binds to the loop it is first used on, so a fresh
+# asyncio.run() per request would break after the first one
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, name="agent-event-loop", daemon=True).start()
+
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop).result()
+
+
+# Patterns used to build file names from the business name
+_SANITIZE_KEEP = re.compile(r'[^\w\s-]')
+_SANITIZE_DASH = re.compile(r'[-\s]+')
+
+# Seconds browsers may reuse the /api/templates response without revalidating
+TEMPLATES_MAX_AGE = 300
+
+# Successful /api/generate responses keyed by a hash of the normalized business info,
+# so re-submitting the same form skips the whole pipeline (bypass with ?no_cache=1).
+# Kept in process memory: under gunicorn every worker has its own copy
+GENERATE_CACHE_SIZE = 128
+_generate_cache: "OrderedDict[str, dict]" = OrderedDict()
+_generate_cache_lock = threading.Lock()
+
+
+def _generate_cache_key(business_info: BusinessInfo) -> str:
+    return hashlib.blake2b(json.dumps(asdict(business_info), sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _get_cached_response(key: str):
+    """Return the cached response for key if its website file still exists."""
+    with _generate_cache_lock:
+        response = _generate_cache.get(key)
+        if response is None:
+            return None
+        if not Path(response['filename']).exists():
+            del _generate_cache[key]
+            return None
+        _generate_cache.move_to_end(key)
+        return response
+
+
+def _cache_response(key: str, response: dict):
+    with _generate_cache_lock:
+        _generate_cache[key] = response
+        _generate_cache.move_to_end(key)
+        while len(_generate_cache) > GENERATE_CACHE_SIZE:
+            _generate_cache.popitem(last=False)
+
 
 # Initialize agents
 business_analysis_agent = None
@@ -65,7 +140,7 @@ def initialize_agents():
     
     # Initialize template loader
     try:
-        template_loader = TemplateLoader()
+        template_loader = TemplateLoader(preload=True)
         html_agent = HTMLAgent(template_loader=template_loader)
     except Exception as e:
         print(f"⚠️ Could not initialize template loader: {e}")
@@ -94,21 +169,24 @@ def get_templates():
     try:
         if template_loader:
             templates = template_loader.list_templates()
-            return jsonify({
-                'success': True,
-                'templates': templates
-            })
         else:
             # Return default template if loader not available
-            return jsonify({
-                'success': True,
-                'templates': [{
-                    'id': 'modern_glass',
-                    'name': 'Modern Glass',
-                    'description': 'Modern design with glassmorphism effects',
-                    'best_for': ['tech', 'startups', 'modern businesses']
-                }]
-            })
+            templates = [{
+                'id': 'modern_glass',
+                'name': 'Modern Glass',
+                'description': 'Modern design with glassmorphism effects',
+                'best_for': ['tech', 'startups', 'modern businesses']
+            }]
+        
+        # Templates only change on redeploy: let browsers cache the list and revalidate via ETag (304)
+        response = jsonify({
+            'success': True,
+            'templates': templates
+        })
+        response.cache_control.public = True
+        response.cache_control.max_age = TEMPLATES_MAX_AGE
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -122,64 +200,43 @@ def generate_website():
         # Get business information from request
         data = request.json
         
-        # Validate required fields
-        required_fields = ['business_name', 'description', 'services', 'target_audience', 
-                          'color_preference', 'style_preference']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required field: {field}'
-                }), 400
-        
-        # Create BusinessInfo object
-        business_info = BusinessInfo(
-            business_name=data['business_name'],
-            description=data['description'],
-            services=data['services'],
-            target_audience=data['target_audience'],
-            color_preference=data['color_preference'],
-            style_preference=data['style_preference'],
-            business_address=data.get('business_address', ''),
-            business_email=data.get('business_email', ''),
-            contact_number=data.get('contact_number', ''),
-            template_id=data.get('template_id', 'modern_glass')
-        )
-        
-        # Step 1: Analyze business
-        print(f"🔍 Analyzing business: {business_info.business_name}")
-        analysis = business_analysis_agent.analyze(business_info)
-        if not analysis:
+        # Validate required fields and create BusinessInfo object
+        try:
+            business_info = BusinessInfo.from_request(data)
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': 'Business analysis failed'
-            }), 500
+                'error': str(e)
+            }), 400
         
-        # Step 2: Generate design suggestions
-        print("🎨 Creating design suggestions...")
-        design = design_agent.suggest_design(business_info, analysis)
-        if not design:
-            return jsonify({
-                'success': False,
-                'error': 'Design generation failed'
-            }), 500
+        no_cache = request.args.get('no_cache') == '1'
+        use_cache = caching_enabled() and not no_cache
+        cache_key = _generate_cache_key(business_info)
+        if use_cache:
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                print(f"⚡ Returning cached website for: {business_info.business_name}")
+                return jsonify({**cached, 'cached': True})
         
-        # Step 3: Generate content
-        print("✍️ Writing website content...")
-        content = content_agent.generate_content(business_info, analysis)
-        if not content:
-            return jsonify({
-                'success': False,
-                'error': 'Content generation failed'
-            }), 500
+        # Steps 1-4: analysis first, then design runs concurrently with content + images
+        print(f"🔍 Generating website for: {business_info.business_name}")
+        pipeline = generate_website_async(
+            business_info, business_analysis_agent, design_agent,
+            content_agent, image_agent, html_agent
+        )
+        # ?no_cache=1 also skips stored Gemini responses so the site is regenerated from scratch
+        result = run_async(without_cached_responses(pipeline) if no_cache else pipeline)
+        analysis, design, content = result['analysis'], result['design'], result['content']
         
-        # Step 4: Fetch images
-        print("📸 Fetching images...")
-        images = image_agent.fetch_images(business_info, content)
+        for step, value in (('Business analysis', analysis), ('Design generation', design), ('Content generation', content)):
+            if not value:
+                return jsonify({
+                    'success': False,
+                    'error': f'{step} failed'
+                }), 500
         
-        # Step 5: Generate HTML
-        print("🏗️ Building HTML website...")
-        html_code = html_agent.generate_html(business_info, design, content, images)
+        # Step 5: HTML was built from the results above
+        html_code = result['html_code']
         if not html_code:
             return jsonify({
                 'success': False,
@@ -187,14 +244,13 @@ def generate_website():
             }), 500
         
         # Save website
-        import re
-        safe_name = re.sub(r'[^\w\s-]', '', business_info.business_name)
-        safe_name = re.sub(r'[-\s]+', '-', safe_name).strip('-').lower()
+        safe_name = _SANITIZE_KEEP.sub('', business_info.business_name)
+        safe_name = _SANITIZE_DASH.sub('-', safe_name).strip('-').lower()
         filename = f"{safe_name}-website.html"
         
         filepath = Path(filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_code)
+        filepath.write_bytes(html_code.encode('utf-8'))
+        precompress_file(filepath)
         
         print(f"✅ Website generated successfully: {filename}")
         
@@ -202,7 +258,7 @@ def generate_website():
         session_id = safe_name + '-' + datetime.now().strftime('%Y%m%d%H%M%S')
         mock_s3_url = f"http://localhost:5000/api/preview/{filename}"
         
-        return jsonify({
+        response = {
             'success': True,
             'message': 'Website generated successfully!',
             'session_id': session_id,
@@ -216,7 +272,11 @@ def generate_website():
             'design': design,
             'content': content,
             'generation_time': datetime.now().isoformat()
-        })
+        }
+        if use_cache:
+            _cache_response(cache_key, response)
+        
+        return jsonify(response)
         
     except Exception as e:
         print(f"❌ Error generating website: {e}")
@@ -230,14 +290,14 @@ def generate_website():
 def preview_website(filename):
     """Preview generated website file (like S3 URL)."""
     try:
-        filepath = Path(filename)
-        if filepath.exists():
-            return send_file(filepath, mimetype='text/html')
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'File not found'
-            }), 404
+        # Absolute (cwd-based, like the saved files) so send_file's own stat is the only lookup
+        filepath = Path(filename).absolute()
+        return send_file(filepath, mimetype='text/html')
+    except FileNotFoundError:
+        return jsonify({
+            'success': False,
+            'error': 'File not found'
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
@@ -248,14 +308,12 @@ def preview_website(filename):
 def download_website(filename):
     """Download generated website file."""
     try:
-        filepath = Path(filename)
-        if filepath.exists():
-            return send_file(filepath, as_attachment=True)
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'File not found'
-            }), 404
+        return send_file(Path(filename).absolute(), as_attachment=True)
+    except FileNotFoundError:
+        return jsonify({
+            'success': False,
+            'error': 'File not found'
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
@@ -277,4 +335,23 @@ if __name__ == '__main__':
     print(f"   GET  /api/download/<filename> - Download website")
     print("="*60)
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    use_gunicorn = os.getenv('USE_GUNICORN') == '1' and not debug
+    if use_gunicorn and not shutil.which('gunicorn'):
+        print("⚠️ USE_GUNICORN=1 but gunicorn is not installed (pip install gunicorn). Using the Flask server.")
+        use_gunicorn = False
+    
+    if not use_gunicorn:
+        # Development server (auto-reload with FLASK_ENV=development)
+        app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
+    else:
+        # Production: several gunicorn worker processes, each with threads since
+        # requests mostly wait on Gemini/Unsplash. No --preload: every worker
+        # imports the app itself and starts its own agent event loop thread.
+        workers = int(os.getenv('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+        os.execvp('gunicorn', [
+            'gunicorn', 'api:app',
+            '--bind', f'0.0.0.0:{port}',
+            '--workers', str(workers),
+            '--worker-class', 'gthread',
+            '--threads', os.getenv('GUNICORN_THREADS', '8')
+        ])
@@ -8,9 +8,17 @@ import os
 import json
 import sys
 import re
+import string
+import asyncio
+import gzip
+import zlib
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Annotated
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Annotated
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 
 try:
     import google.generativeai as genai
@@ -28,6 +36,13 @@ except ImportError:
     print("Please install with: pip install langgraph")
     sys.exit(1)
 
+try:
+    import jinja2
+except ImportError:
+    print("❌ Error: Jinja2 package not found!")
+    print("Please install with: pip install jinja2")
+    sys.exit(1)
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -35,27 +50,271 @@ except ImportError:
     # dotenv is optional
     pass
 
+from response_cache import caching_enabled, get_cache_dir, get_prompt_cache, cache_response, open_disk_cache
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+try:
+    # aiohttp lets fetch_images_async run all section searches on one event loop
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    # brotli is optional; saved websites always get a .gz copy and a .br copy when available
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    # orjson parses agent responses faster; its JSONDecodeError subclasses json's
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Import template loader for HTML templates
 try:
-    from template_loader import TemplateLoader
+    from template_loader import TemplateLoader, iter_render_template
 except ImportError:
     print("⚠️ Warning: template_loader not found. Using inline HTML generation.")
     TemplateLoader = None
 
 
+# Patterns used by GeminiAgent.extract_json
+_JSON_FENCE_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+_MD_FENCE_RE = re.compile(r'```[a-z]*\n?')
+
+# Patterns used by BusinessWebsiteGenerator.save_website to build file names
+_SANITIZE_KEEP = re.compile(r'[^\w\s-]')
+_SANITIZE_DASH = re.compile(r'[-\s]+')
+
+
+def _find_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text using a single linear scan.
+    
+    Tracks brace depth and skips braces inside JSON strings (honouring
+    backslash escapes), so arbitrary nesting works without regex backtracking.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _create_jinja_env() -> jinja2.Environment:
+    """
+    Jinja2 environment for the inline fallback template, compiled once per process.
+    
+    Compiled bytecode is also kept on disk under the cache directory, following
+    the same WEBSITE_GEN_CACHE / WEBSITE_GEN_CACHE_DIR settings as the other caches.
+    """
+    bytecode_cache = None
+    if caching_enabled():
+        try:
+            cache_dir = get_cache_dir() / "jinja"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(str(cache_dir))
+        except OSError:
+            # Read-only home (Lambda, containers): compile in memory only
+            pass
+    
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(Path(__file__).parent / "templates")),
+        autoescape=jinja2.select_autoescape(['html', 'j2']),
+        auto_reload=False,
+        bytecode_cache=bytecode_cache
+    )
+
+
+INLINE_TEMPLATE_NAME = "inline_fallback.html.j2"
+_JINJA_ENV = _create_jinja_env()
+
+def precompress_file(filepath: Path):
+    """
+    Write filepath.gz (and filepath.br when brotli is installed) next to a saved file.
+    
+    Static hosts can serve these directly to clients that accept the encoding.
+    Off by default (max-level compression costs CPU on every save); enable with
+    WEBSITE_GEN_PRECOMPRESS=1. The file is streamed in 64 KiB chunks.
+    """
+    if os.getenv("WEBSITE_GEN_PRECOMPRESS") != "1":
+        return
+    
+    with open(filepath, 'rb') as src, gzip.open(f"{filepath}.gz", 'wb', compresslevel=9) as dst:
+        shutil.copyfileobj(src, dst, 65536)
+    
+    if brotli is not None:
+        compressor = brotli.Compressor(quality=11)
+        with open(filepath, 'rb') as src, open(f"{filepath}.br", 'wb') as dst:
+            for chunk in iter(lambda: src.read(65536), b''):
+                dst.write(compressor.process(chunk))
+            dst.write(compressor.finish())
+
+
+# Cached Unsplash URLs expire after a week
+IMAGE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# (connect, read) timeouts in seconds for Unsplash calls; a slow search
+# falls back to a placeholder image instead of holding up the page
+UNSPLASH_TIMEOUT = (2, 5)
+
+# Used by ImageAgent._extract_keywords
+_PUNCT_TABLE = str.maketrans('', '', '.,!?')
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'we', 'our', 'your'})
+
+# Fallback images used by ImageAgent._get_placeholder_images
+_PLACEHOLDER_SERVICE_IMAGES = (
+    'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=600&fit=crop',  # Analytics
+    'https://images.unsplash.com/photo-1553877522-43269d4ea984?w=800&h=600&fit=crop',  # Design
+    'https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=600&fit=crop',  # Technology
+    'https://images.unsplash.com/photo-1551434678-e076c223a692?w=800&h=600&fit=crop',  # Employee
+    'https://images.unsplash.com/photo-1556761175-4b46a572b786?w=800&h=600&fit=crop',  # Architecture
+    'https://images.unsplash.com/photo-1542744173-8e7e53415bb0?w=800&h=600&fit=crop',  # Business Meeting
+    'https://images.unsplash.com/photo-1517245386807-bb43f82c33c4?w=800&h=600&fit=crop',  # Startup
+    'https://images.unsplash.com/photo-1560472355-109703aa3edc?w=800&h=600&fit=crop',  # Buildings
+    'https://images.unsplash.com/photo-1488590528505-98d2b5aba04b?w=800&h=600&fit=crop',  # Technology 2
+    'https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800&h=600&fit=crop'   # Marketing
+)
+_PLACEHOLDER_IMAGES = {
+    'hero': 'https://images.unsplash.com/photo-1497366216548-37526070297c?w=1200&h=600&fit=crop',  # Office space
+    'about': 'https://images.unsplash.com/photo-1522071820081-009f0129c71c?w=1200&h=600&fit=crop',  # Team
+    'services': _PLACEHOLDER_SERVICE_IMAGES,
+    'cta': 'https://images.unsplash.com/photo-1551836022-deb4988cc6c0?w=1200&h=600&fit=crop'  # Business
+}
+
+
+# User prompts for the analysis, design and content agents
+_ANALYSIS_PROMPT = string.Template("""
+        Analyze this business and provide insights in JSON format:
+        
+        Business: $business_name
+        Description: $description
+        Services: $services
+        Target Audience: $target_audience
+        
+        Return ONLY this JSON structure:
+        {
+            "key_strengths": ["strength1", "strength2", "strength3"],
+            "customer_needs": ["need1", "need2", "need3"],
+            "unique_value_proposition": "A clear statement of what makes this business special",
+            "tone_of_voice": "professional",
+            "competitive_advantages": ["advantage1", "advantage2"]
+        }
+        """)
+
+_DESIGN_PROMPT = string.Template("""
+        Create comprehensive design suggestions for this business to make it visually stunning and interactive:
+        
+        Business: $business_name
+        Industry: $description
+        Target Audience: $target_audience
+        Color Preference: $color_preference
+        Style Preference: $style_preference
+        Tone: $tone
+        
+        Design a modern, interactive website with animations and visual appeal. Return ONLY this JSON structure:
+        {
+            "primary_color": "#2c3e50",
+            "secondary_color": "#3498db",
+            "accent_color": "#e74c3c",
+            "background_color": "#ffffff",
+            "text_color": "#333333",
+            "gradient_primary": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+            "gradient_secondary": "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)",
+            "font_family": "'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
+            "heading_font": "'Playfair Display', 'Georgia', serif",
+            "layout_style": "modern with animations and interactions",
+            "visual_elements": ["parallax scrolling", "hover animations", "smooth transitions", "glassmorphism effects", "floating elements"],
+            "animation_style": "smooth and engaging",
+            "card_style": "glassmorphism with shadows",
+            "button_style": "animated with hover effects",
+            "navigation_style": "fixed with backdrop blur",
+            "hero_style": "animated gradient background with floating elements"
+        }
+        """)
+
+_CONTENT_PROMPT = string.Template("""
+        Write website content for this business in JSON format:
+        
+        Business: $business_name
+        Description: $description
+        Services: $services
+        Target Audience: $target_audience
+        Key Strengths: $key_strengths
+        Value Proposition: $value_proposition
+        Tone: $tone
+        
+        Return ONLY this JSON structure:
+        {
+            "hero_headline": "Welcome to $business_name",
+            "hero_subtext": "Professional service description",
+            "hero_cta": "Get Started",
+            "about_title": "About Us",
+            "about_text": "About section content",
+            "services_title": "Our Services",
+            "services_intro": "Brief intro to services",
+            "service_items": [
+                {"name": "Service 1", "description": "Description"},
+                {"name": "Service 2", "description": "Description"}
+            ],
+            "cta_section_title": "Ready to Get Started?",
+            "cta_text": "Contact us today",
+            "cta_button": "Contact Us",
+            "footer_text": "Footer text about the business"
+        }
+        """)
+
+
 # State management for LangGraph (using official TypedDict approach)
+def _merge_step(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer for current_step: parallel nodes may both report a step; an error step sticks."""
+    return current if current == "error" else new
+
+
+def _merge_error(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer for error: keep the first error reported by any branch."""
+    return current or new
+
+
 class WebsiteState(TypedDict):
     business_info: Dict
     analysis: Dict
     design_suggestions: Dict
     website_content: Dict
     images: Dict  # NEW: Image URLs from Unsplash
-    html_code: str
-    current_step: str
-    error: Optional[str]
+    current_step: Annotated[str, _merge_step]
+    error: Annotated[Optional[str], _merge_error]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BusinessInfo:
     business_name: str
     description: str
@@ -67,108 +326,248 @@ class BusinessInfo:
     business_email: str = ""
     contact_number: str = ""
     template_id: str = "modern_glass"  # Default template
+    
+    REQUIRED_FIELDS = ('business_name', 'description', 'services', 'target_audience',
+                       'color_preference', 'style_preference')
+    
+    @classmethod
+    def from_request(cls, data: Dict) -> "BusinessInfo":
+        """
+        Validate a request payload and build BusinessInfo from it in one pass.
+        
+        Args:
+            data: Request JSON with the BusinessInfo fields (unknown keys are ignored)
+            
+        Returns:
+            BusinessInfo instance
+            
+        Raises:
+            ValueError: If a required field is missing or empty
+        """
+        for field in cls.REQUIRED_FIELDS:
+            if not data.get(field):
+                raise ValueError(f'Missing required field: {field}')
+        return cls(
+            business_name=data['business_name'],
+            description=data['description'],
+            services=data['services'],
+            target_audience=data['target_audience'],
+            color_preference=data['color_preference'],
+            style_preference=data['style_preference'],
+            business_address=data.get('business_address', ''),
+            business_email=data.get('business_email', ''),
+            contact_number=data.get('contact_number', ''),
+            template_id=data.get('template_id', 'modern_glass')
+        )
+    
+    @property
+    def services_list(self) -> Tuple[str, ...]:
+        """Comma-separated services split and stripped (memoized per services string)."""
+        return _split_services(self.services)
+
+
+@lru_cache(maxsize=256)
+def _split_services(services: str) -> Tuple[str, ...]:
+    return tuple(s.strip() for s in services.split(','))
+
+
+def _embed_text(text: str):
+    """Embed a prompt for semantic response-cache lookups."""
+    return genai.embed_content(model="models/text-embedding-004", content=text)["embedding"]
 
 
 class GeminiAgent:
     """Base agent class for Google Gemini AI interactions."""
     
+    # Output cap per call; subclasses lower it to their expected response size
+    max_output_tokens = 3000
+    # JSON agents stop reading the stream once a complete top-level object has arrived
+    stop_at_json = False
+    
     def __init__(self, model_name: str = "gemini-2.5-flash-lite"):
         self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
+        self.response_cache = get_prompt_cache(embed=_embed_text)
     
-    def call_api(self, prompt: str, system_prompt: str = "", max_retries: int = 3) -> Optional[str]:
+    @cache_response
+    def call_api(self, prompt: str, system_prompt: str = "", max_retries: int = 3,
+                 max_tokens: Optional[int] = None) -> Optional[str]:
         """Make API call with retry logic and better error handling."""
         for attempt in range(max_retries):
+            text = ""
             try:
-                # Combine system prompt and user prompt for Gemini
-                full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-                
                 response = self.model.generate_content(
-                    full_prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.3,  # Lower temperature for more consistent JSON
-                        max_output_tokens=3000
-                    )
+                    self._build_full_prompt(prompt, system_prompt),
+                    generation_config=self._generation_config(max_tokens or self.max_output_tokens),
+                    stream=True
                 )
                 
-                return response.text.strip()
+                for chunk in response:
+                    chunk_text = self._chunk_text(chunk)
+                    text += chunk_text
+                    if self._json_complete(text, chunk_text):
+                        break
+                return text.strip()
                 
             except Exception as e:
-                error_msg = str(e).lower()
+                if _find_json_object(text) is not None:
+                    # The stream broke after a complete JSON answer had arrived; keep it
+                    return text.strip()
                 if attempt == max_retries - 1:
-                    if "rate limit" in error_msg or "quota" in error_msg:
-                        print(f"❌ Rate limit exceeded. Please wait and try again.")
-                    elif "unauthorized" in error_msg or "invalid" in error_msg:
-                        print(f"❌ API key issue. Please check your GOOGLE_API_KEY.")
-                    elif "timeout" in error_msg or "connection" in error_msg:
-                        print(f"❌ Connection issue. Please check your internet connection.")
-                    else:
-                        print(f"❌ API call failed: {e}")
+                    self._report_api_error(e)
                     return None
                 print(f"⚠️ Attempt {attempt + 1} failed, retrying...")
         return None
     
+    @cache_response
+    async def call_api_async(self, prompt: str, system_prompt: str = "", max_retries: int = 3,
+                             max_tokens: Optional[int] = None) -> Optional[str]:
+        """Async variant of call_api so independent agents can run concurrently."""
+        for attempt in range(max_retries):
+            text = ""
+            try:
+                response = await self.model.generate_content_async(
+                    self._build_full_prompt(prompt, system_prompt),
+                    generation_config=self._generation_config(max_tokens or self.max_output_tokens),
+                    stream=True
+                )
+                
+                async for chunk in response:
+                    chunk_text = self._chunk_text(chunk)
+                    text += chunk_text
+                    if self._json_complete(text, chunk_text):
+                        break
+                return text.strip()
+                
+            except Exception as e:
+                if _find_json_object(text) is not None:
+                    # The stream broke after a complete JSON answer had arrived; keep it
+                    return text.strip()
+                if attempt == max_retries - 1:
+                    self._report_api_error(e)
+                    return None
+                print(f"⚠️ Attempt {attempt + 1} failed, retrying...")
+        return None
+    
+    @staticmethod
+    def _build_full_prompt(prompt: str, system_prompt: str) -> str:
+        """Combine system prompt and user prompt for Gemini."""
+        return f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+    
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        """Text of a streamed chunk; chunks without a text part (finish reason only, blocked) give ''."""
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+    
+    def _json_complete(self, text: str, chunk_text: str) -> bool:
+        """True once the streamed text holds a full JSON object (only rescanned when a '}' arrives)."""
+        return self.stop_at_json and '}' in chunk_text and _find_json_object(text) is not None
+    
+    @staticmethod
+    def _generation_config(max_tokens: int):
+        return genai.types.GenerationConfig(
+            temperature=0.3,  # Lower temperature for more consistent JSON
+            max_output_tokens=max_tokens
+        )
+    
+    @staticmethod
+    def _report_api_error(error: Exception):
+        """Print a user-friendly message for the final failed attempt."""
+        error_msg = str(error).lower()
+        if "rate limit" in error_msg or "quota" in error_msg:
+            print(f"❌ Rate limit exceeded. Please wait and try again.")
+        elif "unauthorized" in error_msg or "invalid" in error_msg:
+            print(f"❌ API key issue. Please check your GOOGLE_API_KEY.")
+        elif "timeout" in error_msg or "connection" in error_msg:
+            print(f"❌ Connection issue. Please check your internet connection.")
+        else:
+            print(f"❌ API call failed: {error}")
+    
+    def is_cacheable(self, response: str) -> bool:
+        """Only responses that parse to a JSON object are stored in the response cache."""
+        return isinstance(self._parse_json(response), dict)
+    
     def extract_json(self, response: str) -> Optional[Dict]:
         """Extract and parse JSON from response with multiple strategies."""
+        result = self._parse_json(response)
+        if result is None and response:
+            print(f"❌ Failed to extract JSON from response: {response[:200]}...")
+        return result
+    
+    @staticmethod
+    def _parse_json(response: str) -> Optional[Dict]:
+        """The parsing strategies behind extract_json, without the failure message."""
         if not response:
             return None
             
         # Strategy 1: Look for JSON block with code fences
-        json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
+        json_match = _JSON_FENCE_RE.search(response)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                return _json_loads(json_match.group(1))
             except json.JSONDecodeError:
                 pass
         
         # Strategy 2: Look for any JSON object
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
-        if json_match:
+        json_object = _find_json_object(response)
+        if json_object:
             try:
-                return json.loads(json_match.group())
+                return _json_loads(json_object)
             except json.JSONDecodeError:
                 pass
         
         # Strategy 3: Try to clean and parse entire response
+        cleaned = response.strip()
+        if cleaned.startswith('```'):
+            # Common case: one opening and one closing fence around the body
+            cleaned = cleaned.split('\n', 1)[1] if '\n' in cleaned else cleaned[3:]
+        cleaned = cleaned.removesuffix('```').strip()
         try:
-            # Remove markdown formatting and clean
-            cleaned = re.sub(r'```[a-z]*\n?', '', response)
-            cleaned = cleaned.strip()
-            return json.loads(cleaned)
+            return _json_loads(cleaned)
         except json.JSONDecodeError:
             pass
         
-        print(f"❌ Failed to extract JSON from response: {response[:200]}...")
+        if '```' in response:
+            try:
+                # Rare case: fences in the middle of the response
+                return _json_loads(_MD_FENCE_RE.sub('', response).strip())
+            except json.JSONDecodeError:
+                pass
+        
         return None
 
 
 class BusinessAnalysisAgent(GeminiAgent):
     """Agent specialized in business analysis."""
     
+    max_output_tokens = 512
+    stop_at_json = True
+    
+    system_prompt = """You are a business analysis expert. You MUST respond with ONLY valid JSON.
+Do not include any text before or after the JSON. Do not use code blocks or markdown formatting."""
+    
     def analyze(self, business_info: BusinessInfo) -> Optional[Dict]:
         """Analyze business and extract key insights."""
-        system_prompt = """You are a business analysis expert. You MUST respond with ONLY valid JSON.
-Do not include any text before or after the JSON. Do not use code blocks or markdown formatting."""
-        
-        prompt = f"""
-        Analyze this business and provide insights in JSON format:
-        
-        Business: {business_info.business_name}
-        Description: {business_info.description}
-        Services: {business_info.services}
-        Target Audience: {business_info.target_audience}
-        
-        Return ONLY this JSON structure:
-        {{
-            "key_strengths": ["strength1", "strength2", "strength3"],
-            "customer_needs": ["need1", "need2", "need3"],
-            "unique_value_proposition": "A clear statement of what makes this business special",
-            "tone_of_voice": "professional",
-            "competitive_advantages": ["advantage1", "advantage2"]
-        }}
-        """
-        
-        response = self.call_api(prompt, system_prompt)
+        response = self.call_api(self._build_prompt(business_info), self.system_prompt)
+        return self._parse_analysis(response, business_info)
+    
+    async def analyze_async(self, business_info: BusinessInfo) -> Optional[Dict]:
+        """Async variant of analyze."""
+        response = await self.call_api_async(self._build_prompt(business_info), self.system_prompt)
+        return self._parse_analysis(response, business_info)
+    
+    def _build_prompt(self, business_info: BusinessInfo) -> str:
+        return _ANALYSIS_PROMPT.substitute(
+            business_name=business_info.business_name,
+            description=business_info.description,
+            services=business_info.services,
+            target_audience=business_info.target_audience
+        )
+    
+    def _parse_analysis(self, response: Optional[str], business_info: BusinessInfo) -> Dict:
         result = self.extract_json(response)
         
         # Provide fallback if JSON parsing fails
@@ -188,9 +587,10 @@ Do not include any text before or after the JSON. Do not use code blocks or mark
 class DesignAgent(GeminiAgent):
     """Agent specialized in web design suggestions."""
     
-    def suggest_design(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
-        """Generate design suggestions based on business analysis."""
-        system_prompt = """You are an expert UI/UX designer and front-end developer specializing in creating visually stunning, interactive websites. You MUST respond with ONLY valid JSON.
+    max_output_tokens = 768
+    stop_at_json = True
+    
+    system_prompt = """You are an expert UI/UX designer and front-end developer specializing in creating visually stunning, interactive websites. You MUST respond with ONLY valid JSON.
 Do not include any text before or after the JSON. Do not use code blocks or markdown formatting.
 
 Focus on creating modern, engaging designs with:
@@ -201,39 +601,28 @@ Focus on creating modern, engaging designs with:
 - Responsive design principles
 - Visual hierarchy and typography
 - Professional yet creative aesthetics"""
-        
-        prompt = f"""
-        Create comprehensive design suggestions for this business to make it visually stunning and interactive:
-        
-        Business: {business_info.business_name}
-        Industry: {business_info.description}
-        Target Audience: {business_info.target_audience}
-        Color Preference: {business_info.color_preference}
-        Style Preference: {business_info.style_preference}
-        Tone: {analysis.get('tone_of_voice', 'professional')}
-        
-        Design a modern, interactive website with animations and visual appeal. Return ONLY this JSON structure:
-        {{
-            "primary_color": "#2c3e50",
-            "secondary_color": "#3498db",
-            "accent_color": "#e74c3c",
-            "background_color": "#ffffff",
-            "text_color": "#333333",
-            "gradient_primary": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-            "gradient_secondary": "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)",
-            "font_family": "'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
-            "heading_font": "'Playfair Display', 'Georgia', serif",
-            "layout_style": "modern with animations and interactions",
-            "visual_elements": ["parallax scrolling", "hover animations", "smooth transitions", "glassmorphism effects", "floating elements"],
-            "animation_style": "smooth and engaging",
-            "card_style": "glassmorphism with shadows",
-            "button_style": "animated with hover effects",
-            "navigation_style": "fixed with backdrop blur",
-            "hero_style": "animated gradient background with floating elements"
-        }}
-        """
-        
-        response = self.call_api(prompt, system_prompt)
+    
+    def suggest_design(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
+        """Generate design suggestions based on business analysis."""
+        response = self.call_api(self._build_prompt(business_info, analysis), self.system_prompt)
+        return self._parse_design(response)
+    
+    async def suggest_design_async(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
+        """Async variant of suggest_design."""
+        response = await self.call_api_async(self._build_prompt(business_info, analysis), self.system_prompt)
+        return self._parse_design(response)
+    
+    def _build_prompt(self, business_info: BusinessInfo, analysis: Dict) -> str:
+        return _DESIGN_PROMPT.substitute(
+            business_name=business_info.business_name,
+            description=business_info.description,
+            target_audience=business_info.target_audience,
+            color_preference=business_info.color_preference,
+            style_preference=business_info.style_preference,
+            tone=analysis.get('tone_of_voice', 'professional')
+        )
+    
+    def _parse_design(self, response: Optional[str]) -> Dict:
         result = self.extract_json(response)
         
         # Provide enhanced fallback if JSON parsing fails
@@ -264,45 +653,42 @@ Focus on creating modern, engaging designs with:
 class ContentAgent(GeminiAgent):
     """Agent specialized in content generation."""
     
+    # Base cap for the hero/about/CTA/contact copy, plus room for every service entry
+    max_output_tokens = 1024
+    tokens_per_service = 150
+    stop_at_json = True
+    
+    system_prompt = """You are a web copywriting expert. You MUST respond with ONLY valid JSON.
+Do not include any text before or after the JSON. Do not use code blocks or markdown formatting."""
+    
     def generate_content(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
         """Generate website content."""
-        system_prompt = """You are a web copywriting expert. You MUST respond with ONLY valid JSON.
-Do not include any text before or after the JSON. Do not use code blocks or markdown formatting."""
-        
-        services_list = [s.strip() for s in business_info.services.split(',')]
-        
-        prompt = f"""
-        Write website content for this business in JSON format:
-        
-        Business: {business_info.business_name}
-        Description: {business_info.description}
-        Services: {services_list}
-        Target Audience: {business_info.target_audience}
-        Key Strengths: {analysis.get('key_strengths', [])}
-        Value Proposition: {analysis.get('unique_value_proposition', '')}
-        Tone: {analysis.get('tone_of_voice', 'professional')}
-        
-        Return ONLY this JSON structure:
-        {{
-            "hero_headline": "Welcome to {business_info.business_name}",
-            "hero_subtext": "Professional service description",
-            "hero_cta": "Get Started",
-            "about_title": "About Us",
-            "about_text": "About section content",
-            "services_title": "Our Services",
-            "services_intro": "Brief intro to services",
-            "service_items": [
-                {{"name": "Service 1", "description": "Description"}},
-                {{"name": "Service 2", "description": "Description"}}
-            ],
-            "cta_section_title": "Ready to Get Started?",
-            "cta_text": "Contact us today",
-            "cta_button": "Contact Us",
-            "footer_text": "Footer text about the business"
-        }}
-        """
-        
-        response = self.call_api(prompt, system_prompt)
+        response = self.call_api(self._build_prompt(business_info, analysis), self.system_prompt,
+                                 max_tokens=self._max_tokens(business_info))
+        return self._parse_content(response, business_info)
+    
+    async def generate_content_async(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
+        """Async variant of generate_content."""
+        response = await self.call_api_async(self._build_prompt(business_info, analysis), self.system_prompt,
+                                             max_tokens=self._max_tokens(business_info))
+        return self._parse_content(response, business_info)
+    
+    def _max_tokens(self, business_info: BusinessInfo) -> int:
+        """Output cap sized to the service list, so long lists aren't cut off mid-JSON."""
+        return self.max_output_tokens + self.tokens_per_service * len(business_info.services_list)
+    
+    def _build_prompt(self, business_info: BusinessInfo, analysis: Dict) -> str:
+        return _CONTENT_PROMPT.substitute(
+            business_name=business_info.business_name,
+            description=business_info.description,
+            services=list(business_info.services_list),
+            target_audience=business_info.target_audience,
+            key_strengths=analysis.get('key_strengths', []),
+            value_proposition=analysis.get('unique_value_proposition', ''),
+            tone=analysis.get('tone_of_voice', 'professional')
+        )
+    
+    def _parse_content(self, response: Optional[str], business_info: BusinessInfo) -> Dict:
         result = self.extract_json(response)
         
         # Provide fallback if JSON parsing fails
@@ -316,7 +702,7 @@ Do not include any text before or after the JSON. Do not use code blocks or mark
                 "about_text": f"{business_info.business_name} is dedicated to providing exceptional service to {business_info.target_audience}.",
                 "services_title": "Our Services",
                 "services_intro": "We offer comprehensive services tailored to your needs:",
-                "service_items": [{"name": service.strip(), "description": f"Professional {service.strip().lower()} services"} for service in services_list[:3]],
+                "service_items": [{"name": service, "description": f"Professional {service.lower()} services"} for service in business_info.services_list[:3]],
                 "cta_section_title": "Ready to Get Started?",
                 "cta_text": "Contact us today to learn more about our services.",
                 "cta_button": "Contact Us",
@@ -333,6 +719,42 @@ class ImageAgent:
         """Initialize ImageAgent with Unsplash API access."""
         self.unsplash_access_key = os.getenv('UNSPLASH_ACCESS_KEY')
         self.base_url = "https://api.unsplash.com"
+        self.session = self._create_session() if requests else None
+        # aiohttp session reused across fetch_images_async calls on the same event loop
+        self._async_session = None
+        self._async_session_loop = None
+        # Image URLs keyed by (query, orientation), kept for a week to spare the 50 req/h quota
+        self.image_cache = open_disk_cache("unsplash.sqlite3")
+    
+    def _create_session(self):
+        """Create a pooled session so searches reuse TCP/TLS connections."""
+        session = requests.Session()
+        session.headers['Authorization'] = f'Client-ID {self.unsplash_access_key}'
+        session.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+        ))
+        return session
+    
+    def _get_async_session(self):
+        """Return the shared aiohttp session, creating it for the running event loop on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._async_session
+        if session is None or session.closed or self._async_session_loop is not loop:
+            session = aiohttp.ClientSession(
+                headers={'Authorization': f'Client-ID {self.unsplash_access_key}'},
+                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(sock_connect=UNSPLASH_TIMEOUT[0], sock_read=UNSPLASH_TIMEOUT[1])
+            )
+            self._async_session, self._async_session_loop = session, loop
+        return session
+    
+    async def aclose(self):
+        """Close the shared aiohttp session (call before the event loop shuts down)."""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = self._async_session_loop = None
     
     def fetch_images(self, business_info: BusinessInfo, content: Dict) -> Dict:
         """
@@ -355,48 +777,125 @@ class ImageAgent:
             print("⚠️ UNSPLASH_ACCESS_KEY not found. Using placeholder images.")
             return self._get_placeholder_images(business_info, num_services)
         
-        try:
-            import requests
-        except ImportError:
+        if requests is None:
             print("⚠️ requests library not found. Using placeholder images.")
             print("Install with: pip install requests")
             return self._get_placeholder_images(business_info, num_services)
         
-        images = {}
-        
         try:
-            # Fetch hero image based on business description
-            hero_query = self._extract_keywords(business_info.description, business_info.business_name)
-            images['hero'] = self._search_unsplash(hero_query, orientation='landscape')
-            
-            # Fetch about section image
-            about_query = f"{business_info.business_name} team professional"
-            images['about'] = self._search_unsplash(about_query, orientation='landscape')
-            
-            # Fetch service images based on service items
-            service_images = []
             service_items = content.get('service_items', [])
-            # Fetch images for ALL services (no limit)
-            for i, service in enumerate(service_items):
-                service_query = service.get('name', 'business service')
-                img_url = self._search_unsplash(service_query, orientation='landscape')
-                service_images.append(img_url)
-                print(f"  📸 Fetched image {i+1}/{len(service_items)}: {service.get('name', 'Service')}")
-            images['services'] = service_images
-            print(f"  ✅ Total service images fetched: {len(service_images)}")
+            queries = self._section_queries(business_info, service_items)
+            unique = self._unique_queries(queries)
             
-            # Fetch CTA background image
-            cta_query = f"{business_info.business_name} call to action"
-            images['cta'] = self._search_unsplash(cta_query, orientation='landscape')
+            # Reuse cached URLs, then one batched request covers most sections;
+            # search individually only for the rest
+            results = self._cached_results(unique, 'landscape')
+            uncached = {key: query for key, query in unique.items() if key not in results}
+            if uncached:
+                results.update(self._search_unsplash_batch(uncached, orientation='landscape'))
+            remaining = {key: query for key, query in unique.items() if key not in results}
+            if remaining:
+                with ThreadPoolExecutor(max_workers=6) as executor:
+                    urls = executor.map(
+                        lambda query: self._search_unsplash(query, orientation='landscape'),
+                        remaining.values()
+                    )
+                    results.update(zip(remaining.keys(), urls))
             
-            print(f"✅ Successfully fetched {len(images)} image sections from Unsplash!")
-            return images
+            return self._assemble_images(self._fan_out(queries, results), len(service_items))
             
         except Exception as e:
             print(f"⚠️ Error fetching images from Unsplash: {e}")
             print("Using placeholder images instead.")
             return self._get_placeholder_images(business_info, num_services)
     
+    async def fetch_images_async(self, business_info: BusinessInfo, content: Dict) -> Dict:
+        """
+        Async variant of fetch_images.
+        
+        Searches share one long-lived aiohttp session (keep-alive across calls,
+        at most 6 requests in flight). Without aiohttp, or without an API key, the
+        blocking fetch_images runs in a worker thread instead.
+        """
+        if aiohttp is None or not self.unsplash_access_key:
+            return await asyncio.to_thread(self.fetch_images, business_info, content)
+        
+        print("📸 Fetching relevant images from Unsplash...")
+        service_items = content.get('service_items', [])
+        
+        try:
+            queries = self._section_queries(business_info, service_items)
+            unique = self._unique_queries(queries)
+            # Image cache reads/writes hit SQLite, so they run in worker threads off the event loop
+            results = await asyncio.to_thread(self._cached_results, unique, 'landscape')
+            
+            session = self._get_async_session()
+            uncached = {key: query for key, query in unique.items() if key not in results}
+            if uncached:
+                results.update(await self._search_unsplash_batch_async(session, uncached, 'landscape'))
+            remaining = {key: query for key, query in unique.items() if key not in results}
+            if remaining:
+                semaphore = asyncio.Semaphore(6)
+                urls = await asyncio.gather(*(
+                    self._search_unsplash_async(session, semaphore, query, 'landscape')
+                    for query in remaining.values()
+                ))
+                results.update(zip(remaining.keys(), urls))
+            
+            return self._assemble_images(self._fan_out(queries, results), len(service_items))
+            
+        except Exception as e:
+            print(f"⚠️ Error fetching images from Unsplash: {e}")
+            print("Using placeholder images instead.")
+            return self._get_placeholder_images(business_info, len(service_items))
+    
+    def _section_queries(self, business_info: BusinessInfo, service_items: List[Dict]) -> Dict:
+        """One search query per page section, keyed by section (services by index)."""
+        queries = {
+            'hero': self._extract_keywords(business_info.description, business_info.business_name),
+            'about': f"{business_info.business_name} team professional",
+            'cta': f"{business_info.business_name} call to action"
+        }
+        # Fetch images for ALL services (no limit)
+        for i, service in enumerate(service_items):
+            queries[('services', i)] = service.get('name', 'business service')
+        return queries
+    
+    @staticmethod
+    def _unique_queries(queries: Dict) -> Dict:
+        """Distinct queries keyed by their lowercased form, so sections sharing a query share one search."""
+        unique = {}
+        for query in queries.values():
+            unique.setdefault(query.lower(), query)
+        return unique
+    
+    @staticmethod
+    def _fan_out(queries: Dict, results: Dict) -> Dict:
+        """Map the URLs found per unique query back to every section that asked for it."""
+        return {key: results[query.lower()] for key, query in queries.items() if query.lower() in results}
+    
+    def _cached_results(self, queries: Dict, orientation: str) -> Dict:
+        """Section key -> URL for the queries already in the image cache."""
+        results = {}
+        for key, query in queries.items():
+            cached_url = self._get_cached_url(query, orientation)
+            if cached_url:
+                results[key] = cached_url
+        return results
+    
+    @staticmethod
+    def _assemble_images(results: Dict, num_services: int) -> Dict:
+        images = {
+            'hero': results['hero'],
+            'about': results['about'],
+            'services': [results[('services', i)] for i in range(num_services)],
+            'cta': results['cta']
+        }
+        print(f"  ✅ Total service images fetched: {len(images['services'])}")
+        
+        print(f"✅ Successfully fetched {len(images)} image sections from Unsplash!")
+        return images
+    
     def _search_unsplash(self, query: str, orientation: str = 'landscape', per_page: int = 1) -> str:
         """
         Search Unsplash for an image matching the query.
@@ -409,41 +908,180 @@ class ImageAgent:
         Returns:
             Image URL or placeholder URL
         """
+        cached_url = self._get_cached_url(query, orientation)
+        if cached_url:
+            return cached_url
+        
         try:
-            import requests
-            
-            headers = {
-                'Authorization': f'Client-ID {self.unsplash_access_key}'
-            }
-            
-            params = {
-                'query': query,
-                'orientation': orientation,
-                'per_page': per_page,
-                'content_filter': 'high'  # Filter out sensitive content
-            }
-            
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/search/photos",
-                headers=headers,
-                params=params,
-                timeout=10
+                params=self._search_params(query, orientation, per_page),
+                timeout=UNSPLASH_TIMEOUT
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('results') and len(data['results']) > 0:
-                    # Return regular size URL (best for web)
-                    return data['results'][0]['urls']['regular']
+            data = response.json() if response.status_code == 200 else {}
+            return self._search_result_url(data, query, orientation)
             
-            # Fallback to placeholder
+        except Exception as e:
+            print(f"⚠️ Unsplash API error for '{query}': {e}")
             return self._get_placeholder_url(query)
+    
+    async def _search_unsplash_async(self, session, semaphore: asyncio.Semaphore, query: str,
+                                     orientation: str = 'landscape', per_page: int = 1) -> str:
+        """aiohttp variant of _search_unsplash; semaphore bounds concurrent requests."""
+        cached_url = await asyncio.to_thread(self._get_cached_url, query, orientation)
+        if cached_url:
+            return cached_url
+        
+        try:
+            async with semaphore:
+                async with session.get(
+                    f"{self.base_url}/search/photos",
+                    params=self._search_params(query, orientation, per_page)
+                ) as response:
+                    data = await response.json() if response.status == 200 else {}
+            return await asyncio.to_thread(self._search_result_url, data, query, orientation)
             
         except Exception as e:
             print(f"⚠️ Unsplash API error for '{query}': {e}")
             return self._get_placeholder_url(query)
     
-    def _extract_keywords(self, description: str, business_name: str) -> str:
+    @staticmethod
+    def _search_params(query: str, orientation: str, per_page: int) -> Dict:
+        return {
+            'query': query,
+            'orientation': orientation,
+            'per_page': per_page,
+            'content_filter': 'high'  # Filter out sensitive content
+        }
+    
+    def _search_result_url(self, data: Dict, query: str, orientation: str) -> str:
+        """First result's URL from a /search/photos response (cached), or a placeholder."""
+        if data.get('results'):
+            # Return regular size URL (best for web)
+            url = data['results'][0]['urls']['regular']
+            self._cache_url(query, orientation, url)
+            return url
+        
+        # Fallback to placeholder
+        return self._get_placeholder_url(query)
+    
+    def _get_cached_url(self, query: str, orientation: str) -> Optional[str]:
+        if not self.image_cache:
+            return None
+        try:
+            return self.image_cache.get(f"{orientation}\x00{query.lower()}")
+        except sqlite3.Error as e:
+            # A locked/broken cache is just a miss; it must not turn the page into placeholders
+            print(f"⚠️ Image cache read failed: {e}")
+            return None
+    
+    def _cache_url(self, query: str, orientation: str, url: str):
+        if self.image_cache:
+            try:
+                self.image_cache.set(f"{orientation}\x00{query.lower()}", url, expire=IMAGE_CACHE_TTL)
+            except sqlite3.Error as e:
+                print(f"⚠️ Image cache write failed: {e}")
+    
+    def _search_unsplash_batch(self, queries: Dict, orientation: str = 'landscape') -> Dict:
+        """
+        Fetch photos for several sections with a single /photos/random request.
+        
+        Photos are assigned to the section whose query shares the most words with
+        the photo's description and tags. Sections without a matching photo are
+        left out so the caller can search for them individually.
+        
+        Args:
+            queries: Mapping of section key to search query
+            orientation: Image orientation (landscape, portrait, squarish)
+            
+        Returns:
+            Mapping of section key to image URL for the sections that matched
+        """
+        params = self._batch_params(queries, orientation)
+        if not params:
+            return {}
+        
+        try:
+            response = self.session.get(f"{self.base_url}/photos/random", params=params, timeout=UNSPLASH_TIMEOUT)
+            if response.status_code != 200:
+                return {}
+            photos = response.json()
+        except Exception as e:
+            print(f"⚠️ Unsplash batch request failed: {e}")
+            return {}
+        
+        return self._match_batch(queries, photos)
+    
+    async def _search_unsplash_batch_async(self, session, queries: Dict, orientation: str = 'landscape') -> Dict:
+        """aiohttp variant of _search_unsplash_batch."""
+        params = self._batch_params(queries, orientation)
+        if not params:
+            return {}
+        
+        try:
+            async with session.get(f"{self.base_url}/photos/random", params=params) as response:
+                if response.status != 200:
+                    return {}
+                photos = await response.json()
+        except Exception as e:
+            print(f"⚠️ Unsplash batch request failed: {e}")
+            return {}
+        
+        return self._match_batch(queries, photos)
+    
+    def _batch_params(self, queries: Dict, orientation: str) -> Optional[Dict]:
+        """/photos/random parameters combining the first words of all queries (None if no words)."""
+        combined_terms = list(dict.fromkeys(word for query in queries.values() for word in self._query_words(query)))
+        if not combined_terms:
+            return None
+        return {
+            'query': ' '.join(combined_terms[:5]),
+            'orientation': orientation,
+            'count': min(len(queries), 30),
+            'content_filter': 'high'
+        }
+    
+    def _match_batch(self, queries: Dict, photos: List[Dict]) -> Dict:
+        """
+        Assign batched photos to the sections whose query words they share most.
+        
+        A photo only counts as a match if it shares at least half of the section's
+        query words, so one common word (such as the business name) is not enough.
+        Matches are not written to the image cache: they come from a combined
+        query, and unmatched sections fall back to a per-query search.
+        """
+        query_terms = {key: set(self._query_words(query)) for key, query in queries.items()}
+        available = [(photo, self._photo_terms(photo)) for photo in photos]
+        matched = {}
+        for key, terms in query_terms.items():
+            if not available:
+                break
+            photo, photo_terms = max(available, key=lambda candidate: len(terms & candidate[1]))
+            if terms and 2 * len(terms & photo_terms) >= len(terms):
+                matched[key] = photo['urls']['regular']
+                available.remove((photo, photo_terms))
+        
+        print(f"  📸 Batched Unsplash request matched {len(matched)}/{len(queries)} sections")
+        return matched
+    
+    @staticmethod
+    def _query_words(text: str) -> List[str]:
+        """Lowercased meaningful words of a query or photo description, in order."""
+        return [word for word in text.lower().translate(_PUNCT_TABLE).split() if len(word) > 2 and word not in _STOP_WORDS]
+    
+    def _photo_terms(self, photo: Dict) -> set:
+        """Words describing an Unsplash photo, used to match it to a section."""
+        text = ' '.join(filter(None, [
+            photo.get('alt_description'),
+            photo.get('description'),
+            ' '.join(tag.get('title', '') for tag in photo.get('tags', []))
+        ]))
+        return set(self._query_words(text))
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_keywords(description: str, business_name: str) -> str:
         """
         Extract relevant keywords from business description for image search.
         
@@ -457,12 +1095,9 @@ class ImageAgent:
         # Remove business name from description to avoid too specific searches
         desc_lower = description.lower().replace(business_name.lower(), '')
         
-        # Common words to filter out
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'we', 'our', 'your'}
-        
-        # Extract meaningful words
-        words = [word.strip('.,!?') for word in desc_lower.split()]
-        keywords = [word for word in words if len(word) > 3 and word not in stop_words]
+        # Extract meaningful words (punctuation stripped, common words filtered out)
+        words = desc_lower.translate(_PUNCT_TABLE).split()
+        keywords = [word for word in words if len(word) > 3 and word not in _STOP_WORDS]
         
         # Take first 3 keywords
         query = ' '.join(keywords[:3]) if keywords else business_name
@@ -480,31 +1115,12 @@ class ImageAgent:
         Returns:
             Dictionary with placeholder image URLs
         """
-        # Generate service images - enough for typical needs
-        service_placeholder_urls = [
-            'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=600&fit=crop',  # Analytics
-            'https://images.unsplash.com/photo-1553877522-43269d4ea984?w=800&h=600&fit=crop',  # Design
-            'https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=600&fit=crop',  # Technology
-            'https://images.unsplash.com/photo-1551434678-e076c223a692?w=800&h=600&fit=crop',  # Employee
-            'https://images.unsplash.com/photo-1556761175-4b46a572b786?w=800&h=600&fit=crop',  # Architecture
-            'https://images.unsplash.com/photo-1542744173-8e7e53415bb0?w=800&h=600&fit=crop',  # Business Meeting
-            'https://images.unsplash.com/photo-1517245386807-bb43f82c33c4?w=800&h=600&fit=crop',  # Startup
-            'https://images.unsplash.com/photo-1560472355-109703aa3edc?w=800&h=600&fit=crop',  # Buildings
-            'https://images.unsplash.com/photo-1488590528505-98d2b5aba04b?w=800&h=600&fit=crop',  # Technology 2
-            'https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800&h=600&fit=crop'   # Marketing
-        ]
-        
-        # Ensure we have enough service images
-        services_images = service_placeholder_urls[:num_services] if num_services <= len(service_placeholder_urls) else service_placeholder_urls
-        
-        return {
-            'hero': 'https://images.unsplash.com/photo-1497366216548-37526070297c?w=1200&h=600&fit=crop',  # Office space
-            'about': 'https://images.unsplash.com/photo-1522071820081-009f0129c71c?w=1200&h=600&fit=crop',  # Team
-            'services': services_images,
-            'cta': 'https://images.unsplash.com/photo-1551836022-deb4988cc6c0?w=1200&h=600&fit=crop'  # Business
-        }
+        # Copy so callers can't mutate the shared constants
+        return dict(_PLACEHOLDER_IMAGES, services=list(_PLACEHOLDER_SERVICE_IMAGES[:num_services]))
     
-    def _get_placeholder_url(self, query: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _get_placeholder_url(query: str) -> str:
         """
         Get a placeholder image URL based on query.
         
@@ -515,8 +1131,7 @@ class ImageAgent:
             Placeholder image URL
         """
         # Use picsum for fallback (no API key needed)
-        import hashlib
-        seed = int(hashlib.md5(query.encode()).hexdigest()[:8], 16) % 1000
+        seed = zlib.crc32(query.encode()) % 1000  # Stable across processes, unlike hash()
         return f"https://picsum.photos/seed/{seed}/1200/600"
 
 
@@ -529,66 +1144,88 @@ class HTMLAgent(GeminiAgent):
     
     def generate_html(self, business_info: BusinessInfo, design: Dict, content: Dict, images: Dict = None) -> str:
         """Generate complete interactive HTML website using templates or inline generation."""
+        return "".join(self.iter_html(business_info, design, content, images))
+    
+    def iter_html(self, business_info: BusinessInfo, design: Dict, content: Dict, images: Dict = None) -> Iterator[str]:
+        """
+        Generate the website as consecutive HTML fragments instead of one string.
+        
+        save_website writes these as they are produced, so the CLI never holds
+        the whole document in memory.
         
+        Returns:
+            Iterator over the HTML fragments, in document order
+        """
         # Use empty dict if no images provided
         if images is None:
             images = {}
         
         # Try to use template loader if available
         if self.template_loader and hasattr(business_info, 'template_id'):
-            template_content = self.template_loader.load_template(business_info.template_id)
-            if template_content:
-                return self._generate_from_template(template_content, business_info, design, content, images)
+            compiled = self.template_loader.get_compiled(business_info.template_id)
+            if compiled:
+                return self._iter_from_template(compiled, business_info, design, content, images)
             else:
                 print(f"⚠️ Template '{business_info.template_id}' not found. Using inline generation.")
         
         # Fallback to inline HTML generation
-        return self._generate_inline_html(business_info, design, content, images)
+        return self._iter_inline_html(business_info, design, content, images)
     
-    def _generate_from_template(self, template: str, business_info: BusinessInfo, design: Dict, content: Dict, images: Dict) -> str:
+    def _iter_from_template(self, compiled: Tuple, business_info: BusinessInfo, design: Dict, content: Dict, images: Dict) -> Iterator[str]:
         """Generate HTML by substituting variables in template."""
         print(f"✨ Using template: {business_info.template_id}")
         
+        # Read each field once; several placeholders and defaults reuse them
+        name = business_info.business_name
+        address = business_info.business_address
+        email = business_info.business_email
+        phone = business_info.contact_number
+        
         # Generate service items HTML with images
-        services_html = ""
+        service_parts = []
         service_items = content.get('service_items', [])
         service_images = images.get('services', [])
         
+        num_images = len(service_images)
+        
         for i, service in enumerate(service_items):
+            service_name = service.get('name', 'Service')
+            service_description = service.get('description', 'Professional service description')
             # Use service image if available, otherwise use icon
-            if i < len(service_images) and service_images[i]:
-                services_html += f"""
+            if i < num_images and service_images[i]:
+                service_parts.append(f"""
                 <div class="service-item" data-aos="fade-up">
                     <div class="service-image">
-                        <img src="{service_images[i]}" alt="{service.get('name', 'Service')}" loading="lazy">
+                        <img src="{service_images[i]}" alt="{service_name}" loading="lazy">
                     </div>
-                    <h3>{service.get('name', 'Service')}</h3>
-                    <p>{service.get('description', 'Professional service description')}</p>
-                </div>"""
+                    <h3>{service_name}</h3>
+                    <p>{service_description}</p>
+                </div>""")
             else:
-                services_html += f"""
+                service_parts.append(f"""
                 <div class="service-item" data-aos="fade-up">
                     <div class="service-icon">
                         <i class="fas fa-star"></i>
                     </div>
-                    <h3>{service.get('name', 'Service')}</h3>
-                    <p>{service.get('description', 'Professional service description')}</p>
-                </div>"""
+                    <h3>{service_name}</h3>
+                    <p>{service_description}</p>
+                </div>""")
+        services_html = "".join(service_parts)
         
         # Generate contact section HTML
         contact_section = ""
         # Check if any contact information is provided
-        if business_info.business_address or business_info.business_email or business_info.contact_number:
+        if address or email or phone:
             contact_items = []
             
-            if business_info.business_address:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-map-marker-alt"></i> <span>{business_info.business_address}</span></div>')
+            if address:
+                contact_items.append(f'<div class="contact-item"><i class="fas fa-map-marker-alt"></i> <span>{address}</span></div>')
             
-            if business_info.business_email:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-envelope"></i> <a href="mailto:{business_info.business_email}">{business_info.business_email}</a></div>')
+            if email:
+                contact_items.append(f'<div class="contact-item"><i class="fas fa-envelope"></i> <a href="mailto:{email}">{email}</a></div>')
             
-            if business_info.contact_number:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-phone"></i> <a href="tel:{business_info.contact_number}">{business_info.contact_number}</a></div>')
+            if phone:
+                contact_items.append(f'<div class="contact-item"><i class="fas fa-phone"></i> <a href="tel:{phone}">{phone}</a></div>')
             
             contact_section = f"""
         <section class="contact" id="contact">
@@ -602,9 +1239,9 @@ class HTMLAgent(GeminiAgent):
             </div>
         </section>"""
         
-        # Substitute all template variables including images
-        html = template.format(
-            business_name=business_info.business_name,
+        # Substitute all template variables including images (template is parsed once per ID)
+        return iter_render_template(compiled, dict(
+            business_name=name,
             primary_color=design.get('primary_color', '#2c3e50'),
             secondary_color=design.get('secondary_color', '#3498db'),
             accent_color=design.get('accent_color', '#e74c3c'),
@@ -614,12 +1251,12 @@ class HTMLAgent(GeminiAgent):
             gradient_secondary=design.get('gradient_secondary', 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)'),
             font_family=design.get('font_family', "'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"),
             heading_font=design.get('heading_font', "'Playfair Display', 'Georgia', serif"),
-            hero_headline=content.get('hero_headline', f'Welcome to {business_info.business_name}'),
+            hero_headline=content.get('hero_headline', f'Welcome to {name}'),
             hero_subtext=content.get('hero_subtext', business_info.description),
             hero_cta=content.get('hero_cta', 'Get Started'),
             hero_image=images.get('hero', ''),
             about_title=content.get('about_title', 'About Us'),
-            about_text=content.get('about_text', f'{business_info.business_name} provides exceptional service.'),
+            about_text=content.get('about_text', f'{name} provides exceptional service.'),
             about_image=images.get('about', ''),
             services_title=content.get('services_title', 'Our Services'),
             services_intro=content.get('services_intro', 'We offer comprehensive services tailored to your needs.'),
@@ -629,651 +1266,73 @@ class HTMLAgent(GeminiAgent):
             cta_button=content.get('cta_button', 'Contact Us'),
             cta_image=images.get('cta', ''),
             contact_section=contact_section,
-            footer_text=content.get('footer_text', f'© 2024 {business_info.business_name}. All rights reserved.')
-        )
-        
-        return html
+            footer_text=content.get('footer_text', f'© 2024 {name}. All rights reserved.')
+        ))
     
-    def _generate_inline_html(self, business_info: BusinessInfo, design: Dict, content: Dict) -> str:
-        """Generate HTML using inline template (fallback method)."""  
+    def _iter_inline_html(self, business_info: BusinessInfo, design: Dict, content: Dict, images: Dict) -> Iterator[str]:
+        """Generate HTML using the bundled Jinja2 template (fallback method)."""
         print("⚠️ Using inline HTML generation (fallback)")
         
-        # Always generate HTML with enhanced interactive features
-        services_html = ""
-        for service in content.get('service_items', []):
-            services_html += f"""
-                <div class="service-item" data-aos="fade-up">
-                    <div class="service-icon">
-                        <i class="fas fa-star"></i>
-                    </div>
-                    <h3>{service.get('name', 'Service')}</h3>
-                    <p>{service.get('description', 'Professional service description')}</p>
-                </div>"""
-        
-        contact_section = ""
-        # Check if any contact information is provided
-        if business_info.business_address or business_info.business_email or business_info.contact_number:
-            contact_items = []
-            
-            if business_info.business_address:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-map-marker-alt"></i> <span>{business_info.business_address}</span></div>')
-            
-            if business_info.business_email:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-envelope"></i> <a href="mailto:{business_info.business_email}">{business_info.business_email}</a></div>')
-            
-            if business_info.contact_number:
-                contact_items.append(f'<div class="contact-item"><i class="fas fa-phone"></i> <a href="tel:{business_info.contact_number}">{business_info.contact_number}</a></div>')
-            
-            contact_section = f"""
-        <section class="contact" id="contact">
-            <div class="container">
-                <h2 data-aos="fade-up">Contact Us</h2>
-                <div class="contact-content" data-aos="fade-up" data-aos-delay="200">
-                    <div class="contact-info">
-                        {"".join(contact_items)}
-                    </div>
-                </div>
-            </div>
-        </section>"""
-        
-        # Enhanced HTML template with modern interactive features
-        html_template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{business_info.business_name}</title>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Playfair+Display:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-    <link href="https://unpkg.com/aos@2.3.1/dist/aos.css" rel="stylesheet">
-    <style>
-        :root {{
-            --primary-color: {design.get('primary_color', '#2c3e50')};
-            --secondary-color: {design.get('secondary_color', '#3498db')};
-            --accent-color: {design.get('accent_color', '#e74c3c')};
-            --background-color: {design.get('background_color', '#ffffff')};
-            --text-color: {design.get('text_color', '#333333')};
-            --gradient-primary: {design.get('gradient_primary', 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)')};
-            --gradient-secondary: {design.get('gradient_secondary', 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)')};
-            --font-family: {design.get('font_family', "'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif")};
-            --heading-font: {design.get('heading_font', "'Playfair Display', 'Georgia', serif")};
-        }}
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: var(--font-family);
-            line-height: 1.6;
-            color: var(--text-color);
-            background-color: var(--background-color);
-            overflow-x: hidden;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 20px;
-        }}
-        
-        /* Animated Loading Spinner */
-        .loading-spinner {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(45deg, var(--primary-color), var(--secondary-color));
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            z-index: 9999;
-            transition: opacity 0.5s ease;
-        }}
-        
-        .spinner {{
-            width: 50px;
-            height: 50px;
-            border: 3px solid rgba(255, 255, 255, 0.3);
-            border-top: 3px solid white;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }}
-        
-        @keyframes spin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        
-        /* Enhanced Header with Glassmorphism */
-        header {{
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(20px);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.2);
-            padding: 1rem 0;
-            position: fixed;
-            width: 100%;
-            top: 0;
-            z-index: 1000;
-            transition: all 0.3s ease;
-        }}
-        
-        header.scrolled {{
-            background: rgba(44, 62, 80, 0.95);
-            backdrop-filter: blur(30px);
-        }}
-        
-        nav ul {{
-            list-style: none;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-        }}
-        
-        nav ul li {{
-            margin: 0 25px;
-            position: relative;
-        }}
-        
-        nav ul li a {{
-            color: white;
-            text-decoration: none;
-            font-weight: 500;
-            font-size: 1.1rem;
-            transition: all 0.3s ease;
-            position: relative;
-            padding: 10px 0;
-        }}
-        
-        nav ul li a::after {{
-            content: '';
-            position: absolute;
-            bottom: 0;
-            left: 0;
-            width: 0;
-            height: 2px;
-            background: var(--gradient-primary);
-            transition: width 0.3s ease;
-        }}
-        
-        nav ul li a:hover::after {{
-            width: 100%;
-        }}
-        
-        nav ul li a:hover {{
-            color: var(--accent-color);
-            transform: translateY(-2px);
-        }}
-        
-        /* Animated Hero Section */
-        .hero {{
-            background: var(--gradient-primary);
-            color: white;
-            padding: 150px 0 100px;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .hero::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1000 1000"><polygon fill="rgba(255,255,255,0.1)" points="0,1000 1000,0 1000,1000"/></svg>');
-            animation: float 6s ease-in-out infinite;
-        }}
-        
-        @keyframes float {{
-            0%, 100% {{ transform: translateY(0px); }}
-            50% {{ transform: translateY(-20px); }}
-        }}
-        
-        .hero-content {{
-            position: relative;
-            z-index: 2;
-        }}
-        
-        .hero h1 {{
-            font-family: var(--heading-font);
-            font-size: 4rem;
-            margin-bottom: 20px;
-            animation: slideInDown 1s ease-out;
-            background: linear-gradient(45deg, #fff, #f0f0f0);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }}
-        
-        @keyframes slideInDown {{
-            from {{
-                opacity: 0;
-                transform: translateY(-50px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-        
-        .hero p {{
-            font-size: 1.4rem;
-            margin-bottom: 40px;
-            animation: slideInUp 1s ease-out 0.2s both;
-            max-width: 600px;
-            margin-left: auto;
-            margin-right: auto;
-        }}
-        
-        @keyframes slideInUp {{
-            from {{
-                opacity: 0;
-                transform: translateY(50px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-        
-        /* Enhanced CTA Button */
-        .cta-button {{
-            display: inline-block;
-            background: var(--gradient-secondary);
-            color: white;
-            padding: 18px 40px;
-            text-decoration: none;
-            border-radius: 50px;
-            font-weight: 600;
-            font-size: 1.1rem;
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            animation: pulse 2s infinite;
-        }}
-        
-        @keyframes pulse {{
-            0% {{
-                box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            }}
-            50% {{
-                box-shadow: 0 15px 40px rgba(0,0,0,0.4);
-                transform: translateY(-3px);
-            }}
-            100% {{
-                box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            }}
-        }}
-        
-        .cta-button::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent);
-            transition: left 0.5s ease;
-        }}
-        
-        .cta-button:hover::before {{
-            left: 100%;
-        }}
-        
-        .cta-button:hover {{
-            transform: translateY(-5px) scale(1.05);
-            box-shadow: 0 20px 50px rgba(0,0,0,0.4);
-        }}
-        
-        /* Sections with enhanced styling */
-        section {{
-            padding: 80px 0;
-            position: relative;
-        }}
-        
-        h2 {{
-            font-family: var(--heading-font);
-            font-size: 3rem;
-            text-align: center;
-            margin-bottom: 50px;
-            color: var(--primary-color);
-            position: relative;
-        }}
-        
-        h2::after {{
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 100px;
-            height: 4px;
-            background: var(--gradient-primary);
-            border-radius: 2px;
-        }}
-        
-        /* Enhanced Service Cards with Glassmorphism */
-        .services {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-            gap: 40px;
-            margin-top: 60px;
-        }}
-        
-        .service-item {{
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(20px);
-            padding: 40px 30px;
-            border-radius: 20px;
-            text-align: center;
-            transition: all 0.4s ease;
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .service-item::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: var(--gradient-primary);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-            z-index: -1;
-        }}
-        
-        .service-item:hover::before {{
-            opacity: 0.1;
-        }}
-        
-        .service-item:hover {{
-            transform: translateY(-15px) scale(1.02);
-            box-shadow: 0 25px 50px rgba(0,0,0,0.2);
-            border-color: var(--accent-color);
-        }}
-        
-        .service-icon {{
-            width: 80px;
-            height: 80px;
-            margin: 0 auto 20px;
-            background: var(--gradient-secondary);
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 2rem;
-            color: white;
-            transition: all 0.4s ease;
-        }}
-        
-        .service-item:hover .service-icon {{
-            transform: rotate(360deg) scale(1.1);
-        }}
-        
-        .service-item h3 {{
-            color: var(--secondary-color);
-            margin-bottom: 15px;
-            font-size: 1.5rem;
-            font-weight: 600;
-        }}
-        
-        .about {{
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-            position: relative;
-        }}
-        
-        .about::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="50" cy="50" r="2" fill="rgba(52,152,219,0.1)"/></svg>');
-            background-size: 50px 50px;
-        }}
-        
-        .cta-section {{
-            background: var(--gradient-primary);
-            color: white;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .cta-section::before {{
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-            animation: rotate 20s linear infinite;
-        }}
-        
-        @keyframes rotate {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        
-        .contact {{
-            text-align: center;
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-        }}
-        
-        footer {{
-            background: var(--primary-color);
-            color: white;
-            text-align: center;
-            padding: 30px 0;
-            position: relative;
-        }}
-        
-        footer::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--gradient-primary);
-        }}
-        
-        /* Responsive Design */
-        @media (max-width: 768px) {{
-            .hero h1 {{
-                font-size: 2.5rem;
-            }}
-            
-            nav ul {{
-                flex-direction: column;
-                padding: 20px 0;
-            }}
-            
-            nav ul li {{
-                margin: 10px 0;
-            }}
-            
-            .services {{
-                grid-template-columns: 1fr;
-                gap: 30px;
-            }}
-            
-            h2 {{
-                font-size: 2.2rem;
-            }}
-        }}
-        
-        /* Scroll Animations */
-        .fade-in {{
-            opacity: 0;
-            transform: translateY(30px);
-            transition: all 0.8s ease;
-        }}
-        
-        .fade-in.visible {{
-            opacity: 1;
-            transform: translateY(0);
-        }}
-    </style>
-</head>
-<body>
-    <!-- Loading Spinner -->
-    <div class="loading-spinner" id="loadingSpinner">
-        <div class="spinner"></div>
-    </div>
-
-    <header id="header">
-        <nav>
-            <ul>
-                <li><a href="#home">Home</a></li>
-                <li><a href="#about">About</a></li>
-                <li><a href="#services">Services</a></li>
-                <li><a href="#contact">Contact</a></li>
-            </ul>
-        </nav>
-    </header>
-
-    <section id="home" class="hero">
-        <div class="hero-content">
-            <div class="container">
-                <h1>{content.get('hero_headline', business_info.business_name)}</h1>
-                <p>{content.get('hero_subtext', business_info.description)}</p>
-                <a href="#contact" class="cta-button">{content.get('hero_cta', 'Get Started')}</a>
-            </div>
-        </div>
-    </section>
-
-    <section id="about" class="about">
-        <div class="container">
-            <h2 data-aos="fade-up">{content.get('about_title', 'About Us')}</h2>
-            <p style="text-align: center; font-size: 1.2rem; max-width: 800px; margin: 0 auto;" data-aos="fade-up" data-aos-delay="200">
-                {content.get('about_text', business_info.description)}
-            </p>
-        </div>
-    </section>
-
-    <section id="services">
-        <div class="container">
-            <h2 data-aos="fade-up">{content.get('services_title', 'Our Services')}</h2>
-            <p style="text-align: center; margin-bottom: 30px; font-size: 1.1rem;" data-aos="fade-up" data-aos-delay="100">
-                {content.get('services_intro', 'We offer comprehensive services:')}
-            </p>
-            <div class="services">
-                {services_html}
-            </div>
-        </div>
-    </section>
-
-    <section class="cta-section">
-        <div class="container">
-            <h2 data-aos="fade-up">{content.get('cta_section_title', 'Ready to Get Started?')}</h2>
-            <p style="font-size: 1.3rem; margin-bottom: 40px;" data-aos="fade-up" data-aos-delay="200">
-                {content.get('cta_text', 'Contact us today!')}
-            </p>
-            <a href="#contact" class="cta-button" data-aos="fade-up" data-aos-delay="400">{content.get('cta_button', 'Contact Us')}</a>
-        </div>
-    </section>
-
-    {contact_section}
-
-    <footer>
-        <div class="container">
-            <p>{content.get('footer_text', f'© 2024 {business_info.business_name}. All rights reserved.')}</p>
-        </div>
-    </footer>
-
-    <!-- Scripts -->
-    <script src="https://unpkg.com/aos@2.3.1/dist/aos.js"></script>
-    <script>
-        // Initialize AOS animations
-        AOS.init({{
-            duration: 800,
-            easing: 'ease-out-cubic',
-            once: true,
-            offset: 100
-        }});
-
-        // Loading spinner
-        window.addEventListener('load', function() {{
-            const spinner = document.getElementById('loadingSpinner');
-            setTimeout(() => {{
-                spinner.style.opacity = '0';
-                setTimeout(() => {{
-                    spinner.style.display = 'none';
-                }}, 500);
-            }}, 1000);
-        }});
-
-        // Header scroll effect
-        window.addEventListener('scroll', function() {{
-            const header = document.getElementById('header');
-            if (window.scrollY > 100) {{
-                header.classList.add('scrolled');
-            }} else {{
-                header.classList.remove('scrolled');
-            }}
-        }});
-
-        // Smooth scrolling for navigation links
-        document.querySelectorAll('a[href^="#"]').forEach(anchor => {{
-            anchor.addEventListener('click', function (e) {{
-                e.preventDefault();
-                const target = document.querySelector(this.getAttribute('href'));
-                if (target) {{
-                    target.scrollIntoView({{
-                        behavior: 'smooth',
-                        block: 'start'
-                    }});
-                }}
-            }});
-        }});
-
-        // Parallax effect for hero section
-        window.addEventListener('scroll', function() {{
-            const scrolled = window.pageYOffset;
-            const parallax = document.querySelector('.hero');
-            if (parallax) {{
-                const speed = scrolled * 0.5;
-                parallax.style.transform = `translateY(${{speed}}px)`;
-            }}
-        }});
-
-        // Interactive service cards
-        document.querySelectorAll('.service-item').forEach(card => {{
-            card.addEventListener('mouseenter', function() {{
-                this.style.transform = 'translateY(-15px) scale(1.02)';
-            }});
-            
-            card.addEventListener('mouseleave', function() {{
-                this.style.transform = 'translateY(0) scale(1)';
-            }});
-        }});
-
-        // Add floating animation to CTA buttons
-        document.querySelectorAll('.cta-button').forEach(button => {{
-            setInterval(() => {{
-                button.style.animation = 'none';
-                setTimeout(() => {{
-                    button.style.animation = 'pulse 2s infinite';
-                }}, 10);
-            }}, 4000);
-        }});
-    </script>
-</body>
-</html>"""
-        
-        return html_template
+        return _JINJA_ENV.get_template(INLINE_TEMPLATE_NAME).generate(
+            business=business_info,
+            design=design,
+            content=content,
+            images=images
+        )
+
+
+async def generate_website_async(
+    business_info: BusinessInfo,
+    business_analysis_agent: BusinessAnalysisAgent,
+    design_agent: DesignAgent,
+    content_agent: ContentAgent,
+    image_agent: ImageAgent,
+    html_agent: HTMLAgent
+) -> Dict:
+    """
+    Run the agent pipeline with independent steps overlapped.
+    
+    Design and content only depend on the analysis, and images only depend on
+    the content, so design runs concurrently with content + image fetching.
+    
+    Returns:
+        Dictionary with analysis, design, content, images and html_code
+    """
+    analysis = await business_analysis_agent.analyze_async(business_info)
+    
+    async def content_and_images():
+        content = await content_agent.generate_content_async(business_info, analysis)
+        images = await image_agent.fetch_images_async(business_info, content)
+        return content, images
+    
+    design, (content, images) = await asyncio.gather(
+        design_agent.suggest_design_async(business_info, analysis),
+        content_and_images()
+    )
+    
+    html_code = html_agent.generate_html(business_info, design, content, images)
+    
+    return {
+        "analysis": analysis,
+        "design": design,
+        "content": content,
+        "images": images,
+        "html_code": html_code
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_template_loader():
+    """Process-wide TemplateLoader (config and template files are read once), or None."""
+    if not TemplateLoader:
+        return None
+    try:
+        template_loader = TemplateLoader()
+        print("✅ Template system loaded successfully!")
+        return template_loader
+    except Exception as e:
+        print(f"⚠️ Could not initialize template loader: {e}")
+        return None
 
 
 class BusinessWebsiteGenerator:
@@ -1286,16 +1345,7 @@ class BusinessWebsiteGenerator:
         self.image_agent = None
         self.html_agent = None
         self.graph = None
-        self.template_loader = None
-        
-        # Initialize template loader if available
-        if TemplateLoader:
-            try:
-                self.template_loader = TemplateLoader()
-                print("✅ Template system loaded successfully!")
-            except Exception as e:
-                print(f"⚠️ Could not initialize template loader: {e}")
-                self.template_loader = None
+        self.template_loader = _get_template_loader()
         
     def setup_gemini_client(self) -> bool:
         """Initialize Google Gemini AI client and agents."""
@@ -1423,14 +1473,14 @@ class BusinessWebsiteGenerator:
             return None
     
     def setup_langgraph(self):
-        """Setup LangGraph workflow using official StateGraph approach."""
+        """Setup LangGraph workflow using official StateGraph approach (async nodes, run with ainvoke)."""
         
-        def analyze_business_node(state: WebsiteState):
+        async def analyze_business_node(state: WebsiteState):
             """Node for business analysis."""
             print("🔍 Analyzing your business...")
             
             business_info = BusinessInfo(**state["business_info"])
-            analysis = self.business_analysis_agent.analyze(business_info)
+            analysis = await self.business_analysis_agent.analyze_async(business_info)
             
             if analysis:
                 print("✅ Business analysis completed!")
@@ -1445,12 +1495,25 @@ class BusinessWebsiteGenerator:
                     "current_step": "error"
                 }
         
-        def generate_design_node(state: WebsiteState):
+        async def fetch_images(business_info: BusinessInfo, content: Dict) -> Dict:
+            """Fetch relevant images for the generated content (part of the content node)."""
+            print("📸 Fetching images...")
+            
+            images = await self.image_agent.fetch_images_async(business_info, content)
+            
+            if images:
+                print("✅ Images fetched successfully!")
+                return images
+            else:
+                print("⚠️ Using placeholder images")
+                return {}
+        
+        async def generate_design_node(state: WebsiteState):
             """Node for design generation."""
             print("🎨 Creating design suggestions...")
             
             business_info = BusinessInfo(**state["business_info"])
-            design = self.design_agent.suggest_design(business_info, state["analysis"])
+            design = await self.design_agent.suggest_design_async(business_info, state["analysis"])
             
             if design:
                 print("✅ Design suggestions created!")
@@ -1465,18 +1528,19 @@ class BusinessWebsiteGenerator:
                     "current_step": "error"
                 }
         
-        def generate_content_node(state: WebsiteState):
-            """Node for content generation."""
+        async def generate_content_node(state: WebsiteState):
+            """Node for content generation, followed by image fetching for that content."""
             print("✍️ Writing website content...")
             
             business_info = BusinessInfo(**state["business_info"])
-            content = self.content_agent.generate_content(business_info, state["analysis"])
+            content = await self.content_agent.generate_content_async(business_info, state["analysis"])
             
             if content:
                 print("✅ Website content created!")
                 return {
                     "website_content": content,
-                    "current_step": "image_fetching"
+                    "images": await fetch_images(business_info, content),
+                    "current_step": "html_generation"
                 }
             else:
                 print("❌ Content generation failed!")
@@ -1485,51 +1549,6 @@ class BusinessWebsiteGenerator:
                     "current_step": "error"
                 }
         
-        def fetch_images_node(state: WebsiteState):
-            """Node for fetching relevant images."""
-            print("📸 Fetching images...")
-            
-            business_info = BusinessInfo(**state["business_info"])
-            images = self.image_agent.fetch_images(business_info, state["website_content"])
-            
-            if images:
-                print("✅ Images fetched successfully!")
-                return {
-                    "images": images,
-                    "current_step": "html_generation"
-                }
-            else:
-                print("⚠️ Using placeholder images")
-                return {
-                    "images": {},
-                    "current_step": "html_generation"
-                }
-        
-        def generate_html_node(state: WebsiteState):
-            """Node for HTML generation."""
-            print("🏗️ Building HTML website...")
-            
-            business_info = BusinessInfo(**state["business_info"])
-            html_code = self.html_agent.generate_html(
-                business_info, 
-                state["design_suggestions"], 
-                state["website_content"],
-                state.get("images", {})
-            )
-            
-            if html_code:
-                print("✅ HTML website generated!")
-                return {
-                    "html_code": html_code,
-                    "current_step": "completed"
-                }
-            else:
-                print("❌ HTML generation failed!")
-                return {
-                    "error": "HTML generation failed",
-                    "current_step": "error"
-                }
-        
         # Create the StateGraph using official API
         builder = StateGraph(WebsiteState)
         
@@ -1537,42 +1556,83 @@ class BusinessWebsiteGenerator:
         builder.add_node("analyze_business", analyze_business_node)
         builder.add_node("generate_design", generate_design_node)
         builder.add_node("generate_content", generate_content_node)
-        builder.add_node("fetch_images", fetch_images_node)  # NEW: Image fetching node
-        builder.add_node("generate_html", generate_html_node)
         
         # Add edges using official method
+        # Design and content both only need the analysis, so they fan out in parallel.
+        # Images need the content's service list; LangGraph runs nodes in lockstep
+        # supersteps, so a separate images node would also wait for design to finish.
+        # The content node fetches them itself, overlapping content + images with design.
+        # HTML is not a node: run() streams it straight to disk from the final state.
         builder.add_edge(START, "analyze_business")
         builder.add_edge("analyze_business", "generate_design")
-        builder.add_edge("generate_design", "generate_content")
-        builder.add_edge("generate_content", "fetch_images")  # NEW: Fetch images after content
-        builder.add_edge("fetch_images", "generate_html")
-        builder.add_edge("generate_html", END)
+        builder.add_edge("analyze_business", "generate_content")
+        builder.add_edge(["generate_design", "generate_content"], END)
         
         self.graph = builder.compile()
     
-    def save_website(self, html_code: str, business_name: str) -> Tuple[bool, str]:
-        """Save the generated website to an HTML file."""
+    def save_website(self, html_code: Union[str, Iterable[str]], business_name: str) -> Tuple[bool, str]:
+        """
+        Save the generated website to an HTML file.
+        
+        Args:
+            html_code: Complete HTML, or fragments such as HTMLAgent.iter_html()
+                       yields, which are written as they are produced
+            business_name: Business name used to build the file name
+            
+        Returns:
+            Tuple of (success, absolute file path)
+        """
         print("\n💾 Saving website file...")
         
         try:
             # Create safe filename
-            safe_name = re.sub(r'[^\w\s-]', '', business_name)
-            safe_name = re.sub(r'[-\s]+', '-', safe_name).strip('-').lower()
+            safe_name = _SANITIZE_KEEP.sub('', business_name)
+            safe_name = _SANITIZE_DASH.sub('-', safe_name).strip('-').lower()
             filename = f"{safe_name}-website.html"
             
-            # Save to current directory
-            filepath = Path(filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html_code)
+            # Save to current directory (absolute without resolve(), which stats every parent)
+            filepath = Path.cwd() / filename
+            # newline='' writes the markup byte-for-byte on every platform
+            with open(filepath, 'w', encoding='utf-8', newline='', buffering=65536) as f:
+                if isinstance(html_code, str):
+                    f.write(html_code)
+                else:
+                    f.writelines(html_code)
+            precompress_file(filepath)
             
-            absolute_path = filepath.resolve()
             print(f"✅ Website saved successfully!")
-            return True, str(absolute_path)
+            return True, str(filepath)
             
         except Exception as e:
             print(f"❌ Failed to save website: {e}")
             return False, ""
     
+    async def arun(self, business_info: BusinessInfo) -> WebsiteState:
+        """
+        Execute the LangGraph workflow for one business.
+        
+        Analysis fans out to the design node and the content node (which
+        fetches images once its content is ready); both branches are async
+        and run concurrently; the workflow ends once both are done.
+        
+        Args:
+            business_info: Business to generate the website for
+            
+        Returns:
+            Final workflow state, with everything needed to build the HTML
+        """
+        initial_state = {
+            "business_info": asdict(business_info),
+            "analysis": {},
+            "design_suggestions": {},
+            "website_content": {},
+            "images": {},  # NEW: Images field
+            "current_step": "analyze_business",
+            "error": None
+        }
+        
+        return await self.graph.ainvoke(initial_state)
+    
     def run(self) -> bool:
         """Run the complete website generation process."""
         print("🚀 BUSINESS WEBSITE GENERATOR WITH LANGGRAPH AGENTS")
@@ -1593,32 +1653,28 @@ class BusinessWebsiteGenerator:
         
         # Step 4: Run the LangGraph workflow
         try:
-            initial_state = {
-                "business_info": business_info.__dict__,
-                "analysis": {},
-                "design_suggestions": {},
-                "website_content": {},
-                "images": {},  # NEW: Images field
-                "html_code": "",
-                "current_step": "analyze_business",
-                "error": None
-            }
+            async def run_workflow():
+                try:
+                    return await self.arun(business_info)
+                finally:
+                    await self.image_agent.aclose()
             
-            # Execute the workflow using official invoke method
-            final_state = self.graph.invoke(initial_state)
+            final_state = asyncio.run(run_workflow())
             
             # Check if workflow completed successfully
             if final_state.get("error"):
                 print(f"❌ Workflow failed: {final_state['error']}")
                 return False
             
-            if not final_state.get("html_code"):
-                print("❌ No HTML code generated")
-                return False
-            
-            # Step 5: Save website
+            # Step 5: Build the HTML and stream it into the website file
+            print("🏗️ Building HTML website...")
             success, filepath = self.save_website(
-                final_state["html_code"], 
+                self.html_agent.iter_html(
+                    business_info,
+                    final_state["design_suggestions"],
+                    final_state["website_content"],
+                    final_state.get("images", {})
+                ),
                 business_info.business_name
             )
             
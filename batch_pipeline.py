@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Batch Pipeline Module for Business Website Generator
+Generates many websites at once through the Gemini Batch API
+(half the cost of interactive calls and higher rate limits)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    # The Batch API is only exposed by the newer google-genai SDK
+    from google import genai as genai_sdk
+    from google.genai import types
+except ImportError:
+    genai_sdk = None
+    types = None
+
+from app import (
+    BusinessInfo,
+    BusinessAnalysisAgent,
+    DesignAgent,
+    ContentAgent,
+    ImageAgent,
+    HTMLAgent,
+    GeminiAgent,
+    TemplateLoader,
+    BusinessWebsiteGenerator
+)
+
+
+class BatchPipeline:
+    """Runs the analysis/design/content agents for many businesses as Gemini batch jobs"""
+
+    TERMINAL_STATES = {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED"
+    }
+
+    def __init__(
+        self,
+        model_name: str = "gemini-2.5-flash-lite",
+        api_key: Optional[str] = None,
+        poll_interval: int = 30,
+        work_dir: Optional[Path] = None
+    ):
+        """
+        Initialize the batch pipeline
+
+        Args:
+            model_name: Gemini model used for every batched request
+            api_key: Gemini API key. Defaults to GOOGLE_API_KEY.
+            poll_interval: Seconds between batch job status checks
+            work_dir: Directory for the JSONL request files. Defaults to a temp dir.
+        """
+        if genai_sdk is None:
+            raise ImportError("Batch mode requires the google-genai package: pip install google-genai")
+
+        self.model_name = model_name
+        self.poll_interval = poll_interval
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix="website_batch_"))
+        self.client = genai_sdk.Client(api_key=api_key or os.getenv('GOOGLE_API_KEY'))
+
+        # Agents are only used for prompt building and response parsing here
+        self.business_analysis_agent = BusinessAnalysisAgent(model_name)
+        self.design_agent = DesignAgent(model_name)
+        self.content_agent = ContentAgent(model_name)
+        self.image_agent = ImageAgent()
+        self.html_agent = HTMLAgent(model_name, template_loader=TemplateLoader() if TemplateLoader else None)
+
+    def submit(self, business_infos: List[BusinessInfo]) -> List[Dict]:
+        """
+        Generate websites for all businesses using two batch jobs
+
+        Analysis runs first; design and content depend on it and are batched
+        together in the second job. Images and HTML are then built locally.
+
+        Args:
+            business_infos: Businesses to generate websites for
+
+        Returns:
+            List of dictionaries with analysis, design, content, images and html_code,
+            in the same order as business_infos
+        """
+        print(f"📦 Submitting analysis batch for {len(business_infos)} businesses...")
+        analysis_prompts = {
+            f"{bi_id}:analysis": self._request(self.business_analysis_agent, self.business_analysis_agent._build_prompt(bi))
+            for bi_id, bi in enumerate(business_infos)
+        }
+        responses = self._run_batch(analysis_prompts, "website-analysis")
+        analyses = [
+            self.business_analysis_agent._parse_analysis(responses.get(f"{bi_id}:analysis"), bi)
+            for bi_id, bi in enumerate(business_infos)
+        ]
+
+        print("📦 Submitting design + content batch...")
+        prompts = {}
+        for bi_id, (bi, analysis) in enumerate(zip(business_infos, analyses)):
+            prompts[f"{bi_id}:design"] = self._request(self.design_agent, self.design_agent._build_prompt(bi, analysis))
+            prompts[f"{bi_id}:content"] = self._request(
+                self.content_agent, self.content_agent._build_prompt(bi, analysis), self.content_agent._max_tokens(bi)
+            )
+        responses = self._run_batch(prompts, "website-design-content")
+
+        results = []
+        for bi_id, (bi, analysis) in enumerate(zip(business_infos, analyses)):
+            design = self.design_agent._parse_design(responses.get(f"{bi_id}:design"))
+            content = self.content_agent._parse_content(responses.get(f"{bi_id}:content"), bi)
+            images = self.image_agent.fetch_images(bi, content)
+            results.append({
+                "business_info": bi,
+                "analysis": analysis,
+                "design": design,
+                "content": content,
+                "images": images,
+                "html_code": self.html_agent.generate_html(bi, design, content, images)
+            })
+
+        return results
+
+    @staticmethod
+    def _request(agent: GeminiAgent, prompt: str, max_tokens: Optional[int] = None) -> Dict:
+        """Build one GenerateContentRequest in the batch JSONL format"""
+        return {
+            "contents": [{
+                "role": "user",
+                "parts": [{"text": agent._build_full_prompt(prompt, agent.system_prompt)}]
+            }],
+            "generation_config": {"temperature": 0.3, "max_output_tokens": max_tokens or agent.max_output_tokens}
+        }
+
+    def _run_batch(self, requests: Dict[str, Dict], display_name: str) -> Dict[str, Optional[str]]:
+        """Upload requests as JSONL, run the batch job and return response text by key"""
+        jsonl_path = self.work_dir / f"{display_name}-{int(time.time())}.jsonl"
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for key, request in requests.items():
+                f.write(json.dumps({"key": key, "request": request}) + "\n")
+
+        uploaded = self.client.files.upload(
+            file=str(jsonl_path),
+            config=types.UploadFileConfig(display_name=display_name, mime_type='jsonl')
+        )
+        job = self.client.batches.create(
+            model=self.model_name,
+            src=uploaded.name,
+            config={'display_name': display_name}
+        )
+        print(f"  ⏳ Batch job created: {job.name}")
+
+        while job.state.name not in self.TERMINAL_STATES:
+            time.sleep(self.poll_interval)
+            job = self.client.batches.get(name=job.name)
+            print(f"  ⏳ {job.name}: {job.state.name}")
+
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Batch job {job.name} ended with state {job.state.name}")
+
+        result_bytes = self.client.files.download(file=job.dest.file_name)
+        return self._parse_results(result_bytes.decode('utf-8'))
+
+    @staticmethod
+    def _parse_results(jsonl: str) -> Dict[str, Optional[str]]:
+        """Map each result line's key to its response text (None for failed requests)"""
+        results = {}
+        for line in jsonl.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = entry.get("key")
+            try:
+                parts = entry["response"]["candidates"][0]["content"]["parts"]
+                results[key] = "".join(part.get("text", "") for part in parts).strip()
+            except (KeyError, IndexError, TypeError):
+                print(f"⚠️ Batch request {key} failed: {entry.get('error', 'no response')}")
+                results[key] = None
+        return results
+
+
+def main():
+    """Generate websites for every business in a JSON file (a list of BusinessInfo fields)."""
+    if len(sys.argv) != 2:
+        print("Usage: python batch_pipeline.py businesses.json")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        business_infos = [BusinessInfo(**entry) for entry in json.load(f)]
+
+    results = BatchPipeline().submit(business_infos)
+
+    generator = BusinessWebsiteGenerator()
+    for result in results:
+        success, filepath = generator.save_website(result["html_code"], result["business_info"].business_name)
+        if success:
+            print(f"📁 {result['business_info'].business_name}: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
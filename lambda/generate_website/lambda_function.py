@@ -2,12 +2,27 @@
 AWS Lambda Function: Generate Website
 Handles website generation using Google Gemini AI multi-agent system
 """
+import io
 import json
 import os
+import re
 import boto3
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import traceback
 
+try:
+    # orjson serializes the response (full HTML + agent output) several times faster
+    import orjson
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 # Import your existing agents (will be packaged with Lambda)
 # These will come from the Lambda Layer
 genai = None
@@ -17,6 +32,7 @@ ContentAgent = None
 ImageAgent = None
 HTMLAgent = None
 BusinessInfo = None
+generate_website = None
 
 try:
     print("Attempting to import google.generativeai...")
@@ -30,18 +46,17 @@ try:
         ContentAgent,
         ImageAgent,
         HTMLAgent,
-        BusinessInfo
+        BusinessInfo,
+        generate_website
     )
     print("SUCCESS: All modules imported successfully")
 except ImportError as e:
     print(f"IMPORT ERROR: {str(e)}")
     print(f"Import error type: {type(e).__name__}")
-    import traceback
     print(f"Full traceback: {traceback.format_exc()}")
 except Exception as e:
     print(f"UNEXPECTED ERROR: {str(e)}")
     print(f"Error type: {type(e).__name__}")
-    import traceback
     print(f"Full traceback: {traceback.format_exc()}")
 
 # Initialize AWS clients
@@ -54,6 +69,22 @@ S3_BUCKET = os.environ.get('S3_BUCKET')
 REGION = os.environ.get('REGION', 'us-east-1')
 CLOUDFRONT_DOMAIN = os.environ.get('CLOUDFRONT_DOMAIN', '')  # CloudFront distribution domain
 
+# Pages at or above the threshold are uploaded as parallel multipart chunks
+MULTIPART_THRESHOLD = 5 * 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_THRESHOLD,
+    max_concurrency=4,
+    use_threads=True
+)
+
+# Runs the S3 upload while the handler builds URLs (reused across warm invocations)
+_upload_executor = ThreadPoolExecutor(max_workers=1)
+
+# Patterns used to build S3-safe session IDs from the business name
+_SANITIZE_KEEP = re.compile(r'[^\w\s-]')
+_SANITIZE_DASH = re.compile(r'[-\s]+')
+
 # Configure Gemini (only if genai was imported successfully)
 if GOOGLE_API_KEY and genai:
     try:
@@ -87,6 +118,44 @@ def initialize_agents():
         print("✓ Agents initialized")
 
 
+# Build the agents and open the S3 connection during the init phase, so the cold
+# start is paid before the first request (and captured by SnapStart snapshots).
+# Failures are only logged here; lambda_handler retries initialize_agents() and
+# reports the error in its response.
+try:
+    initialize_agents()
+except Exception as e:
+    print(f"⚠️ Agent initialization deferred to first request: {e}")
+
+if S3_BUCKET:
+    try:
+        s3_client.head_bucket(Bucket=S3_BUCKET)
+        print("✓ S3 connection warmed")
+    except Exception as e:
+        print(f"⚠️ Could not warm S3 connection: {e}")
+
+
+def upload_html(html_code: str, s3_key: str):
+    """Upload a generated page to S3 (single PUT for typical pages, threaded multipart for large ones)."""
+    body = html_code.encode('utf-8')
+    if len(body) < MULTIPART_THRESHOLD:
+        s3_client.put_object(
+            Bucket=S3_BUCKET,
+            Key=s3_key,
+            Body=body,
+            ContentType='text/html',
+            CacheControl='no-cache'
+        )
+    else:
+        s3_client.upload_fileobj(
+            io.BytesIO(body),
+            S3_BUCKET,
+            s3_key,
+            ExtraArgs={'ContentType': 'text/html', 'CacheControl': 'no-cache'},
+            Config=TRANSFER_CONFIG
+        )
+
+
 def lambda_handler(event, context):
     """
     Lambda handler for website generation
@@ -110,12 +179,12 @@ def lambda_handler(event, context):
     print("=" * 60)
     
     try:
-        # Initialize agents if needed
+        # No-op unless initialization failed at import time
         initialize_agents()
         
         # Parse request body
         if isinstance(event.get('body'), str):
-            body = json.loads(event['body'])
+            body = _json_loads(event['body'])
         else:
             body = event.get('body', event)
         
@@ -156,76 +225,63 @@ def lambda_handler(event, context):
         )
         
         # Generate session ID for this website
-        session_id = f"{business_info.business_name.lower().replace(' ', '-')}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        safe_name = _SANITIZE_KEEP.sub('', business_info.business_name)
+        safe_name = _SANITIZE_DASH.sub('-', safe_name).strip('-').lower()
+        session_id = f"{safe_name}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
         
         print(f"Session ID: {session_id}")
         print(f"Business: {business_info.business_name}")
         print(f"Template: {business_info.template_id}")
         
-        # Step 1: Business Analysis
-        print("\n🔍 Step 1: Analyzing business...")
-        analysis = business_analysis_agent.analyze(business_info)
-        if not analysis:
-            raise Exception("Business analysis failed")
-        print("✓ Analysis complete")
-        
-        # Step 2: Design Suggestions
-        print("\n🎨 Step 2: Creating design suggestions...")
-        design = design_agent.suggest_design(business_info, analysis)
-        if not design:
-            raise Exception("Design generation failed")
-        print("✓ Design complete")
-        
-        # Step 3: Content Generation
-        print("\n✍️ Step 3: Generating content...")
-        content = content_agent.generate_content(business_info, analysis)
-        if not content:
-            raise Exception("Content generation failed")
-        print("✓ Content complete")
-        
-        # Step 4: Image Fetching
-        print("\n📸 Step 4: Fetching images...")
-        images = image_agent.fetch_images(business_info, content)
-        print(f"✓ Images fetched: {len(images)} images")
-        
-        # Step 5: HTML Generation
-        print("\n🏗️ Step 5: Building HTML...")
-        html_code = html_agent.generate_html(business_info, design, content, images)
-        if not html_code:
-            raise Exception("HTML generation failed")
+        # Steps 1-5: analysis, then design alongside content + images, then HTML
+        print("\n🔍 Steps 1-5: Running agent pipeline...")
+        result = generate_website(
+            business_info, business_analysis_agent, design_agent,
+            content_agent, image_agent, html_agent
+        )
+        for step, key in (
+            ("Business analysis", "analysis"),
+            ("Design generation", "design"),
+            ("Content generation", "content"),
+            ("HTML generation", "html_code")
+        ):
+            if not result[key]:
+                raise Exception(f"{step} failed")
+        analysis, design, content = result["analysis"], result["design"], result["content"]
+        html_code = result["html_code"]
+        print(f"✓ Images fetched: {len(result['images'])} images")
         print(f"✓ HTML generated: {len(html_code)} characters")
         
         # Step 6: Upload to S3
         print("\n☁️ Step 6: Uploading to S3...")
         s3_key = f"generated-websites/{session_id}/index.html"
         
-        s3_client.put_object(
-            Bucket=S3_BUCKET,
-            Key=s3_key,
-            Body=html_code.encode('utf-8'),
-            ContentType='text/html',
-            CacheControl='no-cache'
-        )
-        
-        # Generate URLs
-        s3_url = f"https://{S3_BUCKET}.s3.{REGION}.amazonaws.com/{s3_key}"
-        
-        # Use CloudFront URL if available, otherwise fall back to S3
-        if CLOUDFRONT_DOMAIN:
-            # CloudFront URL (uses OriginPath /generated-websites)
-            website_url = f"https://{CLOUDFRONT_DOMAIN}/{session_id}/index.html"
-            print(f"✓ CloudFront URL: {website_url}")
-        else:
-            website_url = s3_url
-            print(f"✓ S3 URL (CloudFront not configured): {website_url}")
-        
-        # Generate pre-signed URL for download (valid for 1 hour)
-        download_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': S3_BUCKET, 'Key': s3_key},
-            ExpiresIn=3600
-        )
+        # Upload in the background; URL building and presigning below are local work
+        upload = _upload_executor.submit(upload_html, html_code, s3_key)
         
+        try:
+            # Generate URLs
+            s3_url = f"https://{S3_BUCKET}.s3.{REGION}.amazonaws.com/{s3_key}"
+            
+            # Use CloudFront URL if available, otherwise fall back to S3
+            if CLOUDFRONT_DOMAIN:
+                # CloudFront URL (uses OriginPath /generated-websites)
+                website_url = f"https://{CLOUDFRONT_DOMAIN}/{session_id}/index.html"
+                print(f"✓ CloudFront URL: {website_url}")
+            else:
+                website_url = s3_url
+                print(f"✓ S3 URL (CloudFront not configured): {website_url}")
+            
+            # Generate pre-signed URL for download (valid for 1 hour)
+            download_url = s3_client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': S3_BUCKET, 'Key': s3_key},
+                ExpiresIn=3600
+            )
+        finally:
+            # Join even if presigning failed: an upload still running when the handler
+            # returns would be frozen with the container and resume in a later invocation
+            upload.result()  # Re-raises upload errors
         print(f"✓ Uploaded to S3: {s3_key}")
         
         # Step 7: Prepare response
@@ -256,7 +312,7 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,POST,GET'
             },
-            'body': json.dumps(response_data)
+            'body': _json_dumps(response_data)
         }
         
     except Exception as e:
@@ -8,6 +8,11 @@ import os
 import json
 import sys
 import re
+import zlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, Tuple, Annotated
 from dataclasses import dataclass
@@ -39,6 +44,13 @@ except ImportError:
     # dotenv is optional
     pass
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    # requests is optional; ImageAgent falls back to placeholder images
+    requests = None
+
 # Import template loader for HTML templates
 try:
     from template_loader import TemplateLoader
@@ -47,6 +59,95 @@ except ImportError:
     TemplateLoader = None
 
 
+def _find_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text using a single linear scan.
+    
+    Tracks brace depth and skips braces inside JSON strings (honouring
+    backslash escapes), so arbitrary nesting works without regex backtracking.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+# Unsplash image URLs by (orientation, query), reused across warm Lambda
+# invocations to spare the 50 req/h quota
+IMAGE_CACHE_TTL = 60 * 60
+IMAGE_CACHE_SIZE = 256
+_image_url_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+_image_url_cache_lock = threading.Lock()
+
+# (connect, read) timeouts in seconds for Unsplash searches
+UNSPLASH_TIMEOUT = (2, 5)
+
+# Fallback images used by ImageAgent._get_placeholder_images
+_PLACEHOLDER_SERVICE_IMAGES = (
+    'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=600&fit=crop',  # Analytics
+    'https://images.unsplash.com/photo-1553877522-43269d4ea984?w=800&h=600&fit=crop',  # Design
+    'https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=600&fit=crop',  # Technology
+    'https://images.unsplash.com/photo-1551434678-e076c223a692?w=800&h=600&fit=crop',  # Employee
+    'https://images.unsplash.com/photo-1556761175-4b46a572b786?w=800&h=600&fit=crop',  # Architecture
+    'https://images.unsplash.com/photo-1542744173-8e7e53415bb0?w=800&h=600&fit=crop',  # Business Meeting
+    'https://images.unsplash.com/photo-1517245386807-bb43f82c33c4?w=800&h=600&fit=crop',  # Startup
+    'https://images.unsplash.com/photo-1560472355-109703aa3edc?w=800&h=600&fit=crop',  # Buildings
+    'https://images.unsplash.com/photo-1488590528505-98d2b5aba04b?w=800&h=600&fit=crop',  # Technology 2
+    'https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800&h=600&fit=crop'   # Marketing
+)
+_PLACEHOLDER_IMAGES = {
+    'hero': 'https://images.unsplash.com/photo-1497366216548-37526070297c?w=1200&h=600&fit=crop',  # Office space
+    'about': 'https://images.unsplash.com/photo-1522071820081-009f0129c71c?w=1200&h=600&fit=crop',  # Team
+    'services': _PLACEHOLDER_SERVICE_IMAGES,
+    'cta': 'https://images.unsplash.com/photo-1551836022-deb4988cc6c0?w=1200&h=600&fit=crop'  # Business
+}
+
+
+def _get_cached_image_url(query: str, orientation: str) -> Optional[str]:
+    """Return the cached URL for query, or None on a miss or once it is older than IMAGE_CACHE_TTL."""
+    key = (orientation, query.lower())
+    with _image_url_cache_lock:
+        entry = _image_url_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, url = entry
+        if time.time() - stored_at > IMAGE_CACHE_TTL:
+            del _image_url_cache[key]
+            return None
+        _image_url_cache.move_to_end(key)
+        return url
+
+
+def _cache_image_url(query: str, orientation: str, url: str):
+    key = (orientation, query.lower())
+    with _image_url_cache_lock:
+        _image_url_cache[key] = (time.time(), url)
+        _image_url_cache.move_to_end(key)
+        while len(_image_url_cache) > IMAGE_CACHE_SIZE:
+            _image_url_cache.popitem(last=False)
+
+
 # State management for LangGraph (using official TypedDict approach)
 class WebsiteState(TypedDict):
     business_info: Dict
@@ -76,6 +177,9 @@ class BusinessInfo:
 class GeminiAgent:
     """Base agent class for Google Gemini AI interactions."""
     
+    # Stop streaming as soon as the response holds a complete JSON object
+    stop_at_json = False
+    
     def __init__(self, model_name: str = "gemini-2.5-flash-lite"):
         self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
@@ -83,6 +187,7 @@ class GeminiAgent:
     def call_api(self, prompt: str, system_prompt: str = "", max_retries: int = 3) -> Optional[str]:
         """Make API call with retry logic and better error handling."""
         for attempt in range(max_retries):
+            text = ""
             try:
                 # Combine system prompt and user prompt for Gemini
                 full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
@@ -92,12 +197,25 @@ class GeminiAgent:
                     generation_config=genai.types.GenerationConfig(
                         temperature=0.3,  # Lower temperature for more consistent JSON
                         max_output_tokens=3000
-                    )
+                    ),
+                    stream=True
                 )
                 
-                return response.text.strip()
+                for chunk in response:
+                    try:
+                        chunk_text = chunk.text
+                    except ValueError:
+                        # Chunks without a text part (finish reason only, blocked candidate)
+                        chunk_text = ""
+                    text += chunk_text
+                    if self.stop_at_json and '}' in chunk_text and _find_json_object(text) is not None:
+                        break
+                return text.strip()
                 
             except Exception as e:
+                if _find_json_object(text) is not None:
+                    # The stream broke after a complete JSON answer had arrived; keep it
+                    return text.strip()
                 error_msg = str(e).lower()
                 if attempt == max_retries - 1:
                     if "rate limit" in error_msg or "quota" in error_msg:
@@ -149,6 +267,8 @@ class GeminiAgent:
 class BusinessAnalysisAgent(GeminiAgent):
     """Agent specialized in business analysis."""
     
+    stop_at_json = True
+    
     def analyze(self, business_info: BusinessInfo) -> Optional[Dict]:
         """Analyze business and extract key insights."""
         system_prompt = """You are a business analysis expert. You MUST respond with ONLY valid JSON.
@@ -192,6 +312,8 @@ Do not include any text before or after the JSON. Do not use code blocks or mark
 class DesignAgent(GeminiAgent):
     """Agent specialized in web design suggestions."""
     
+    stop_at_json = True
+    
     def suggest_design(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
         """Generate design suggestions based on business analysis."""
         system_prompt = """You are an expert UI/UX designer and front-end developer specializing in creating visually stunning, interactive websites. You MUST respond with ONLY valid JSON.
@@ -268,6 +390,8 @@ Focus on creating modern, engaging designs with:
 class ContentAgent(GeminiAgent):
     """Agent specialized in content generation."""
     
+    stop_at_json = True
+    
     def generate_content(self, business_info: BusinessInfo, analysis: Dict) -> Optional[Dict]:
         """Generate website content."""
         system_prompt = """You are a web copywriting expert. You MUST respond with ONLY valid JSON.
@@ -337,6 +461,16 @@ class ImageAgent:
         """Initialize ImageAgent with Unsplash API access."""
         self.unsplash_access_key = os.getenv('UNSPLASH_ACCESS_KEY')
         self.base_url = "https://api.unsplash.com"
+        self.session = None
+    
+    def _get_session(self):
+        """Pooled session shared by the search workers so they reuse TCP/TLS connections."""
+        if self.session is None:
+            session = requests.Session()
+            session.headers['Authorization'] = f'Client-ID {self.unsplash_access_key}'
+            session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+            self.session = session
+        return self.session
     
     def fetch_images(self, business_info: BusinessInfo, content: Dict) -> Dict:
         """
@@ -359,9 +493,7 @@ class ImageAgent:
             print("⚠️ UNSPLASH_ACCESS_KEY not found. Using placeholder images.")
             return self._get_placeholder_images(business_info, num_services)
         
-        try:
-            import requests
-        except ImportError:
+        if requests is None:
             print("⚠️ requests library not found. Using placeholder images.")
             print("Install with: pip install requests")
             return self._get_placeholder_images(business_info, num_services)
@@ -369,29 +501,34 @@ class ImageAgent:
         images = {}
         
         try:
-            # Fetch hero image based on business description
-            hero_query = self._extract_keywords(business_info.description, business_info.business_name)
-            images['hero'] = self._search_unsplash(hero_query, orientation='landscape')
+            service_items = content.get('service_items', [])
+            # Hero (from the description), about, ALL services (no limit), then CTA
+            queries = [
+                self._extract_keywords(business_info.description, business_info.business_name),
+                f"{business_info.business_name} team professional",
+                *(service.get('name', 'business service') for service in service_items),
+                f"{business_info.business_name} call to action"
+            ]
             
-            # Fetch about section image
-            about_query = f"{business_info.business_name} team professional"
-            images['about'] = self._search_unsplash(about_query, orientation='landscape')
+            # Sections sharing a query (e.g. two services with the same name) share one search
+            unique = {}
+            for query in queries:
+                unique.setdefault(query.lower(), query)
             
-            # Fetch service images based on service items
-            service_images = []
-            service_items = content.get('service_items', [])
-            # Fetch images for ALL services (no limit)
-            for i, service in enumerate(service_items):
-                service_query = service.get('name', 'business service')
-                img_url = self._search_unsplash(service_query, orientation='landscape')
-                service_images.append(img_url)
-                print(f"  📸 Fetched image {i+1}/{len(service_items)}: {service.get('name', 'Service')}")
-            images['services'] = service_images
-            print(f"  ✅ Total service images fetched: {len(service_images)}")
+            # Searches are independent HTTPS round-trips, so run them concurrently
+            self._get_session()
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                found = dict(zip(unique, executor.map(
+                    lambda query: self._search_unsplash(query, orientation='landscape'),
+                    unique.values()
+                )))
+            urls = [found[query.lower()] for query in queries]
             
-            # Fetch CTA background image
-            cta_query = f"{business_info.business_name} call to action"
-            images['cta'] = self._search_unsplash(cta_query, orientation='landscape')
+            images['hero'] = urls[0]
+            images['about'] = urls[1]
+            images['services'] = urls[2:-1]
+            images['cta'] = urls[-1]
+            print(f"  ✅ Total service images fetched: {len(images['services'])}")
             
             print(f"✅ Successfully fetched {len(images)} image sections from Unsplash!")
             return images
@@ -413,13 +550,11 @@ class ImageAgent:
         Returns:
             Image URL or placeholder URL
         """
+        cached_url = _get_cached_image_url(query, orientation)
+        if cached_url:
+            return cached_url
+        
         try:
-            import requests
-            
-            headers = {
-                'Authorization': f'Client-ID {self.unsplash_access_key}'
-            }
-            
             params = {
                 'query': query,
                 'orientation': orientation,
@@ -427,18 +562,19 @@ class ImageAgent:
                 'content_filter': 'high'  # Filter out sensitive content
             }
             
-            response = requests.get(
+            response = self._get_session().get(
                 f"{self.base_url}/search/photos",
-                headers=headers,
                 params=params,
-                timeout=10
+                timeout=UNSPLASH_TIMEOUT
             )
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('results') and len(data['results']) > 0:
                     # Return regular size URL (best for web)
-                    return data['results'][0]['urls']['regular']
+                    url = data['results'][0]['urls']['regular']
+                    _cache_image_url(query, orientation, url)
+                    return url
             
             # Fallback to placeholder
             return self._get_placeholder_url(query)
@@ -484,29 +620,8 @@ class ImageAgent:
         Returns:
             Dictionary with placeholder image URLs
         """
-        # Generate service images - enough for typical needs
-        service_placeholder_urls = [
-            'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=600&fit=crop',  # Analytics
-            'https://images.unsplash.com/photo-1553877522-43269d4ea984?w=800&h=600&fit=crop',  # Design
-            'https://images.unsplash.com/photo-1519389950473-47ba0277781c?w=800&h=600&fit=crop',  # Technology
-            'https://images.unsplash.com/photo-1551434678-e076c223a692?w=800&h=600&fit=crop',  # Employee
-            'https://images.unsplash.com/photo-1556761175-4b46a572b786?w=800&h=600&fit=crop',  # Architecture
-            'https://images.unsplash.com/photo-1542744173-8e7e53415bb0?w=800&h=600&fit=crop',  # Business Meeting
-            'https://images.unsplash.com/photo-1517245386807-bb43f82c33c4?w=800&h=600&fit=crop',  # Startup
-            'https://images.unsplash.com/photo-1560472355-109703aa3edc?w=800&h=600&fit=crop',  # Buildings
-            'https://images.unsplash.com/photo-1488590528505-98d2b5aba04b?w=800&h=600&fit=crop',  # Technology 2
-            'https://images.unsplash.com/photo-1557804506-669a67965ba0?w=800&h=600&fit=crop'   # Marketing
-        ]
-        
-        # Ensure we have enough service images
-        services_images = service_placeholder_urls[:num_services] if num_services <= len(service_placeholder_urls) else service_placeholder_urls
-        
-        return {
-            'hero': 'https://images.unsplash.com/photo-1497366216548-37526070297c?w=1200&h=600&fit=crop',  # Office space
-            'about': 'https://images.unsplash.com/photo-1522071820081-009f0129c71c?w=1200&h=600&fit=crop',  # Team
-            'services': services_images,
-            'cta': 'https://images.unsplash.com/photo-1551836022-deb4988cc6c0?w=1200&h=600&fit=crop'  # Business
-        }
+        # Copy so callers can't mutate the shared constants
+        return dict(_PLACEHOLDER_IMAGES, services=list(_PLACEHOLDER_SERVICE_IMAGES[:num_services]))
     
     def _get_placeholder_url(self, query: str) -> str:
         """
@@ -519,8 +634,7 @@ class ImageAgent:
             Placeholder image URL
         """
         # Use picsum for fallback (no API key needed)
-        import hashlib
-        seed = int(hashlib.md5(query.encode()).hexdigest()[:8], 16) % 1000
+        seed = zlib.crc32(query.encode()) % 1000  # Stable across processes, unlike hash()
         return f"https://picsum.photos/seed/{seed}/1200/600"
 
 
@@ -1280,6 +1394,44 @@ class HTMLAgent(GeminiAgent):
         return html_template
 
 
+def generate_website(
+    business_info: BusinessInfo,
+    business_analysis_agent: BusinessAnalysisAgent,
+    design_agent: DesignAgent,
+    content_agent: ContentAgent,
+    image_agent: ImageAgent,
+    html_agent: HTMLAgent
+) -> Dict:
+    """
+    Run the agent pipeline with independent steps overlapped.
+    
+    Design and content only depend on the analysis, and images only depend on
+    the content, so design runs in a worker thread while content + image
+    fetching run on the calling thread. Steps that depend on a failed step are
+    skipped and left as None.
+    
+    Returns:
+        Dictionary with analysis, design, content, images and html_code
+    """
+    result = {"analysis": None, "design": None, "content": None, "images": {}, "html_code": None}
+    
+    analysis = business_analysis_agent.analyze(business_info)
+    result["analysis"] = analysis
+    if not analysis:
+        return result
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        design_future = executor.submit(design_agent.suggest_design, business_info, analysis)
+        content = content_agent.generate_content(business_info, analysis)
+        images = image_agent.fetch_images(business_info, content) if content else {}
+        design = design_future.result()
+    
+    result.update(design=design, content=content, images=images)
+    if design and content:
+        result["html_code"] = html_agent.generate_html(business_info, design, content, images)
+    return result
+
+
 class BusinessWebsiteGenerator:
     """Main orchestrator using LangGraph for agent coordination."""
     
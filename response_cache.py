@@ -0,0 +1,401 @@
+"""
+Response Cache Module for Business Website Generator
+Caches Gemini responses on disk so repeated prompts skip the API call
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is only needed for semantic (embedding) lookups
+    np = None
+
+try:
+    import faiss
+except ImportError:
+    # faiss is optional; numpy dot products are used as fallback
+    faiss = None
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "website_gen"
+
+# Seconds a cache connection waits for another process's write lock
+SQLITE_BUSY_TIMEOUT = 30
+
+# Cached LLM responses expire after a week, so prompt or model changes eventually show up
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+# Set while a caller wants fresh model output (see without_cached_responses); a
+# ContextVar so it follows the request into asyncio tasks and to_thread workers
+_skip_lookups: ContextVar[bool] = ContextVar("skip_prompt_cache_lookups", default=False)
+
+
+class DiskCache:
+    """SQLite-backed key/value store with an in-memory LRU in front of it"""
+
+    def __init__(self, db_path: Path, max_entries: int = 1000, memory_entries: int = 128):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite database file
+            max_entries: Maximum rows kept on disk (least recently used are evicted)
+            memory_entries: Maximum entries kept in the in-memory LRU
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Several processes (e.g. gunicorn workers) share the file: wait for locks
+        # instead of failing, and use WAL so readers don't block the writer
+        self._conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL, expires_at REAL)"
+        )
+        try:
+            # Caches created before expiry support lack the column
+            self._conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or if it has expired"""
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                value, expires_at = self._memory[key]
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, value, expires_at)
+            return value
+
+    def set(self, key: str, value: str, expire: Optional[float] = None):
+        """
+        Store value under key, evicting least recently used rows when full
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expire: Optional lifetime in seconds
+        """
+        now = time.time()
+        expires_at = now + expire if expire else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, last_used, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, expires_at)
+            )
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+            self._remember(key, value, expires_at)
+
+    def items(self):
+        """Return all (key, value) pairs stored on disk"""
+        with self._lock:
+            return self._conn.execute("SELECT key, value FROM entries").fetchall()
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+class SemanticIndex:
+    """Nearest-neighbour lookup over normalized prompt embeddings"""
+
+    def __init__(self, threshold: float = 0.87):
+        self.threshold = threshold
+        self._keys: List[str] = []
+        self._vectors = []
+        self._index = None
+        self._lock = threading.Lock()
+
+    def add(self, key: str, embedding: List[float]):
+        vector = self._normalize(embedding)
+        with self._lock:
+            if faiss is not None:
+                if self._index is None:
+                    self._index = faiss.IndexFlatIP(vector.shape[0])
+                self._index.add(vector.reshape(1, -1))
+            else:
+                self._vectors.append(vector)
+            self._keys.append(key)
+
+    def search(self, embedding: List[float]) -> Optional[str]:
+        """Return the key of the most similar prompt above the threshold, if any"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if not self._keys:
+                return None
+            if self._index is not None:
+                scores, ids = self._index.search(vector.reshape(1, -1), 1)
+                score, best = float(scores[0][0]), int(ids[0][0])
+            else:
+                similarities = np.vstack(self._vectors) @ vector
+                best = int(similarities.argmax())
+                score = float(similarities[best])
+
+        return self._keys[best] if score >= self.threshold else None
+
+    @staticmethod
+    def _normalize(embedding: List[float]):
+        vector = np.asarray(embedding, dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class PromptCache:
+    """Caches LLM responses keyed by agent, model, system prompt and prompt"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        threshold: float = 0.87,
+        max_entries: int = 1000,
+        ttl: Optional[float] = RESPONSE_CACHE_TTL
+    ):
+        """
+        Initialize the prompt cache
+
+        Args:
+            cache_dir: Directory for the SQLite file. Defaults to get_cache_dir()
+            embed: Optional text -> embedding function. Enables semantic lookups
+                   for near-duplicate prompts when numpy is installed.
+            threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum responses kept on disk
+            ttl: Lifetime of a cached response in seconds (None keeps it until evicted)
+        """
+        cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+        self.responses = DiskCache(cache_dir / "responses.sqlite3", max_entries=max_entries)
+        self.embed = embed if np is not None else None
+        self.threshold = threshold
+        self.ttl = ttl
+        # Embeddings of semantic misses awaiting store(); touched from request threads and the agent event loop
+        self._pending: Dict[str, List[float]] = {}
+        self._pending_lock = threading.Lock()
+        self._indexes: Optional[Dict[str, SemanticIndex]] = None
+        if self.embed:
+            self.embeddings = DiskCache(cache_dir / "embeddings.sqlite3", max_entries=max_entries)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return hashlib.blake2b("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, agent_name: str, model_name: str, system_prompt: str, prompt: str) -> Optional[str]:
+        """Return a cached response for an identical (or, in semantic mode, similar) prompt"""
+        key = self.make_key(agent_name, model_name, system_prompt, prompt)
+        cached = self.responses.get(key)
+        if cached is not None or not self.embed:
+            return cached
+
+        try:
+            embedding = self.embed(prompt)
+        except Exception as e:
+            print(f"⚠️ Embedding failed, skipping semantic cache: {e}")
+            return None
+
+        namespace = self.make_key(agent_name, model_name, system_prompt)
+        index = self._load_indexes().get(namespace)
+        match = index.search(embedding) if index else None
+        cached = self.responses.get(match) if match else None
+        if cached is None:
+            # Kept for store(); release() drops it if no response gets stored
+            with self._pending_lock:
+                self._pending[key] = embedding
+        return cached
+
+    def store(self, agent_name: str, model_name: str, system_prompt: str, prompt: str, response: str):
+        """Cache a response for later lookups"""
+        key = self.make_key(agent_name, model_name, system_prompt, prompt)
+        self.responses.set(key, response, expire=self.ttl)
+
+        with self._pending_lock:
+            embedding = self._pending.pop(key, None)
+        if embedding is not None:
+            namespace = self.make_key(agent_name, model_name, system_prompt)
+            self.embeddings.set(key, json.dumps([namespace, list(embedding)]), expire=self.ttl)
+            self._add_to_index(namespace, key, embedding)
+
+    def release(self, agent_name: str, model_name: str, system_prompt: str, prompt: str):
+        """Drop the embedding kept by a semantic miss once no response is going to be stored"""
+        key = self.make_key(agent_name, model_name, system_prompt, prompt)
+        with self._pending_lock:
+            self._pending.pop(key, None)
+
+    def _load_indexes(self) -> Dict[str, SemanticIndex]:
+        """Build the per-namespace indexes from persisted embeddings on first use"""
+        if self._indexes is None:
+            self._indexes = {}
+            for key, value in self.embeddings.items():
+                namespace, embedding = json.loads(value)
+                self._add_to_index(namespace, key, embedding)
+        return self._indexes
+
+    def _add_to_index(self, namespace: str, key: str, embedding: List[float]):
+        self._load_indexes().setdefault(namespace, SemanticIndex(self.threshold)).add(key, embedding)
+
+
+def caching_enabled() -> bool:
+    """Caching can be turned off with WEBSITE_GEN_CACHE=0"""
+    return os.getenv("WEBSITE_GEN_CACHE", "1") != "0"
+
+
+def get_cache_dir() -> Path:
+    """Cache directory; WEBSITE_GEN_CACHE_DIR overrides ~/.cache/website_gen"""
+    return Path(os.getenv("WEBSITE_GEN_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+def open_disk_cache(filename: str, max_entries: int = 1000) -> Optional[DiskCache]:
+    """
+    Open a DiskCache in the cache directory, or None when caching is disabled or unavailable
+
+    Args:
+        filename: SQLite file name inside the cache directory
+        max_entries: Maximum rows kept on disk
+    """
+    if not caching_enabled():
+        return None
+    try:
+        return DiskCache(get_cache_dir() / filename, max_entries=max_entries)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Could not open cache {filename}: {e}")
+        return None
+
+
+_prompt_cache: Optional[PromptCache] = None
+_prompt_cache_lock = threading.Lock()
+
+
+def get_prompt_cache(embed: Optional[Callable[[str], List[float]]] = None) -> Optional[PromptCache]:
+    """
+    Get the process-wide PromptCache, or None when caching is disabled
+
+    Controlled by environment variables:
+        WEBSITE_GEN_CACHE=0            disable response caching
+        WEBSITE_GEN_SEMANTIC_CACHE=1   also match near-duplicate prompts via embeddings
+        WEBSITE_GEN_CACHE_DIR          override ~/.cache/website_gen
+    """
+    global _prompt_cache
+
+    if not caching_enabled():
+        return None
+
+    with _prompt_cache_lock:
+        if _prompt_cache is None:
+            semantic = os.getenv("WEBSITE_GEN_SEMANTIC_CACHE") == "1"
+            if semantic and np is None:
+                print("⚠️ numpy not found. Semantic cache disabled, using exact matches only.")
+            try:
+                _prompt_cache = PromptCache(embed=embed if semantic else None)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Could not open response cache: {e}")
+                return None
+        return _prompt_cache
+
+
+async def without_cached_responses(awaitable):
+    """
+    Await awaitable with prompt-cache lookups skipped
+
+    Every model call made inside it goes to the API; successful responses are
+    still stored, replacing the old entries.
+    """
+    token = _skip_lookups.set(True)
+    try:
+        return await awaitable
+    finally:
+        _skip_lookups.reset(token)
+
+
+def cache_response(func):
+    """
+    Decorator for GeminiAgent.call_api / call_api_async
+
+    Looks the prompt up in self.response_cache before calling the model. A
+    response is stored afterwards only if self.is_cacheable(response) accepts
+    it, so refusals and unparseable or truncated output are not replayed.
+    """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(self, prompt: str, system_prompt: str = "", *args, **kwargs):
+            cache = self.response_cache
+            if cache is None:
+                return await func(self, prompt, system_prompt, *args, **kwargs)
+
+            parts = (type(self).__name__, self.model_name, system_prompt, prompt)
+            cached = None if _skip_lookups.get() else await asyncio.to_thread(cache.lookup, *parts)
+            if cached is not None:
+                return cached
+
+            try:
+                response = await func(self, prompt, system_prompt, *args, **kwargs)
+                if response and self.is_cacheable(response):
+                    await asyncio.to_thread(cache.store, *parts, response)
+                return response
+            finally:
+                cache.release(*parts)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(self, prompt: str, system_prompt: str = "", *args, **kwargs):
+        cache = self.response_cache
+        if cache is None:
+            return func(self, prompt, system_prompt, *args, **kwargs)
+
+        parts = (type(self).__name__, self.model_name, system_prompt, prompt)
+        cached = None if _skip_lookups.get() else cache.lookup(*parts)
+        if cached is not None:
+            return cached
+
+        try:
+            response = func(self, prompt, system_prompt, *args, **kwargs)
+            if response and self.is_cacheable(response):
+                cache.store(*parts, response)
+            return response
+        finally:
+            cache.release(*parts)
+
+    return wrapper
@@ -4,27 +4,117 @@ Handles loading, validation, and management of HTML templates
 """
 
 import json
+import re
+import string
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+_CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+# Divider line used by the text previews
+_RULE = "=" * 60
+
+# Default templates directory next to this module
+DEFAULT_TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Placeholders every template must contain, matched in one scan by validate_template
+REQUIRED_PLACEHOLDERS = (
+    '{business_name}',
+    '{hero_headline}',
+    '{hero_subtext}',
+    '{services_html}',
+    '{contact_section}'
+)
+_REQUIRED_PLACEHOLDER_RE = re.compile('|'.join(map(re.escape, REQUIRED_PLACEHOLDERS)))
+# Same pattern for raw UTF-8 template bytes (placeholders are ASCII)
+_REQUIRED_PLACEHOLDER_BYTES_RE = re.compile(b'|'.join(re.escape(p.encode('ascii')) for p in REQUIRED_PLACEHOLDERS))
+
+
+@lru_cache(maxsize=32)
+def compile_template(template_content: str) -> Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]:
+    """
+    Parse a str.format-style template once into (literal, field, spec, conversion) segments
+    
+    Args:
+        template_content: HTML template content
+        
+    Returns:
+        Tuple of segments accepted by render_template
+    """
+    return tuple(string.Formatter().parse(template_content))
+
+
+def iter_render_template(compiled: Tuple, values: Dict) -> Iterator[str]:
+    """
+    Fill a compiled template, yielding the output one segment at a time
+    
+    Args:
+        compiled: Segments returned by compile_template
+        values: Placeholder values
+        
+    Yields:
+        Consecutive pieces of the rendered HTML
+    """
+    for literal, field, spec, conversion in compiled:
+        if literal:
+            yield literal
+        if field is not None:
+            value = values[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            yield format(value, spec)
+
+
+def render_template(compiled: Tuple, values: Dict) -> str:
+    """
+    Fill a compiled template; equivalent to template_content.format(**values)
+    
+    Args:
+        compiled: Segments returned by compile_template
+        values: Placeholder values
+        
+    Returns:
+        Rendered HTML
+    """
+    return "".join(iter_render_template(compiled, values))
+
 
 class TemplateLoader:
     """Manages HTML template loading and configuration"""
     
-    def __init__(self, templates_dir: Optional[Path] = None):
+    def __init__(self, templates_dir: Optional[Path] = None, preload: bool = False):
         """
         Initialize the template loader
         
         Args:
             templates_dir: Directory containing templates. If None, uses default location.
+            preload: Read every template into memory now instead of on first use
         """
         if templates_dir is None:
             # Default to templates directory in same folder as this script
-            self.templates_dir = Path(__file__).parent / "templates"
+            self.templates_dir = DEFAULT_TEMPLATES_DIR
         else:
             self.templates_dir = Path(templates_dir)
             
         self.config_file = self.templates_dir / "template_config.json"
         self.config = self._load_config()
+        # Template metadata, HTML read from disk and compiled segments, by template ID
+        self._by_id: Dict[str, Dict] = {t.get("id"): t for t in self.config.get("templates", [])}
+        self._templates: Dict[str, str] = {}
+        self._compiled: Dict[str, Tuple] = {}
+        # Absolute template file paths, resolved once
+        self._paths: Dict[str, Path] = {
+            template_id: (self.templates_dir / template["file"]).resolve()
+            for template_id, template in self._by_id.items()
+            if template.get("file")
+        }
+        # Text built by display_all_templates; the config is only read once
+        self._rendered_list: Optional[str] = None
+        
+        if preload:
+            for template_id in self._paths:
+                self.load_template(template_id)
     
     def _load_config(self) -> Dict:
         """Load template configuration from JSON file"""
@@ -57,10 +147,7 @@ class TemplateLoader:
         Returns:
             Template info dictionary or None if not found
         """
-        for template in self.config.get("templates", []):
-            if template.get("id") == template_id:
-                return template
-        return None
+        return self._by_id.get(template_id)
     
     def load_template(self, template_id: str) -> Optional[str]:
         """
@@ -72,17 +159,45 @@ class TemplateLoader:
         Returns:
             Template HTML content as string, or None if not found
         """
-        template_info = self.get_template_info(template_id)
+        if template_id in self._templates:
+            return self._templates[template_id]
+        
+        template_file = self._paths.get(template_id)
         
-        if not template_info:
+        if not template_file:
             print(f"Error: Template '{template_id}' not found in configuration")
             return None
         
-        template_file = self.templates_dir / template_info.get("file")
-        
+        # No exists() pre-check: opening directly costs one lookup and cannot race with a delete
         try:
             with open(template_file, 'r', encoding='utf-8') as f:
-                return f.read()
+                self._templates[template_id] = f.read()
+                return self._templates[template_id]
+        except FileNotFoundError:
+            print(f"Error: Template file not found at {template_file}")
+            return None
+        except Exception as e:
+            print(f"Error loading template: {e}")
+            return None
+    
+    def load_template_bytes(self, template_id: str) -> Optional[bytes]:
+        """
+        Read template file contents without decoding (for validation-only checks)
+        
+        Args:
+            template_id: Template identifier
+            
+        Returns:
+            Raw UTF-8 template bytes, or None if not found
+        """
+        template_file = self._paths.get(template_id)
+        
+        if not template_file:
+            print(f"Error: Template '{template_id}' not found in configuration")
+            return None
+        
+        try:
+            return template_file.read_bytes()
         except FileNotFoundError:
             print(f"Error: Template file not found at {template_file}")
             return None
@@ -90,6 +205,57 @@ class TemplateLoader:
             print(f"Error loading template: {e}")
             return None
     
+    def get_compiled(self, template_id: str) -> Optional[Tuple]:
+        """
+        Load a template and return its compiled segments, ready for render_template
+        
+        Args:
+            template_id: Template identifier
+            
+        Returns:
+            Segments from compile_template, or None if the template cannot be loaded
+        """
+        compiled = self._compiled.get(template_id)
+        if compiled is None:
+            template_content = self.load_template(template_id)
+            if template_content is None:
+                return None
+            compiled = self._compiled[template_id] = compile_template(template_content)
+        return compiled
+    
+    def make_renderer(self, template_id: str) -> Optional[Callable[[Dict], str]]:
+        """
+        Bind a template to a render function for generating many pages from it
+        
+        The template is loaded, validated and compiled here, once; calling the
+        returned function only fills in the placeholders.
+        
+        Args:
+            template_id: Template identifier
+            
+        Returns:
+            Function mapping placeholder values to rendered HTML, or None if the
+            template cannot be loaded or is missing required placeholders
+        """
+        compiled = self.get_compiled(template_id)
+        if compiled is None or not self.validate_template(self.load_template(template_id)):
+            return None
+        return partial(render_template, compiled)
+    
+    def invalidate(self, template_id: Optional[str] = None):
+        """
+        Drop cached template HTML so it is re-read from disk on next use
+        
+        Args:
+            template_id: Template to drop, or None to drop all of them
+        """
+        if template_id is None:
+            self._templates.clear()
+            self._compiled.clear()
+        else:
+            self._templates.pop(template_id, None)
+            self._compiled.pop(template_id, None)
+    
     def get_template_preview(self, template_id: str) -> str:
         """
         Get formatted preview text for a template
@@ -105,27 +271,27 @@ class TemplateLoader:
         if not template:
             return f"Template '{template_id}' not found"
         
-        preview = f"\n{'='*60}\n"
-        preview += f"Template: {template.get('name')}\n"
-        preview += f"ID: {template.get('id')}\n"
-        preview += f"{'='*60}\n"
-        preview += f"\nDescription:\n{template.get('description')}\n"
+        parts = [
+            f"\n{_RULE}\n",
+            f"Template: {template.get('name')}\n",
+            f"ID: {template.get('id')}\n",
+            f"{_RULE}\n",
+            f"\nDescription:\n{template.get('description')}\n"
+        ]
         
         features = template.get('features', [])
         if features:
-            preview += f"\nFeatures:\n"
-            for feature in features:
-                preview += f"  • {feature}\n"
+            parts.append("\nFeatures:\n")
+            parts.extend(f"  • {feature}\n" for feature in features)
         
         best_for = template.get('best_for', [])
         if best_for:
-            preview += f"\nBest For:\n"
-            for category in best_for:
-                preview += f"  • {category}\n"
+            parts.append("\nBest For:\n")
+            parts.extend(f"  • {category}\n" for category in best_for)
         
-        preview += f"\n{'='*60}\n"
+        parts.append(f"\n{_RULE}\n")
         
-        return preview
+        return "".join(parts)
     
     def display_all_templates(self) -> str:
         """
@@ -134,49 +300,49 @@ class TemplateLoader:
         Returns:
             Formatted string with all template information
         """
+        if self._rendered_list is not None:
+            return self._rendered_list
+        
         templates = self.list_templates()
         
         if not templates:
             return "No templates available"
         
-        display = f"\n{'='*60}\n"
-        display += f"Available Templates ({len(templates)})\n"
-        display += f"{'='*60}\n"
+        parts = [
+            f"\n{_RULE}\n",
+            f"Available Templates ({len(templates)})\n",
+            f"{_RULE}\n"
+        ]
         
         for i, template in enumerate(templates, 1):
-            display += f"\n[{i}] {template.get('name')} (ID: {template.get('id')})\n"
-            display += f"    {template.get('description')}\n"
+            parts.append(f"\n[{i}] {template.get('name')} (ID: {template.get('id')})\n")
+            parts.append(f"    {template.get('description')}\n")
             
             best_for = template.get('best_for', [])
             if best_for:
-                display += f"    Best for: {', '.join(best_for)}\n"
+                parts.append(f"    Best for: {', '.join(best_for)}\n")
         
-        display += f"\n{'='*60}\n"
+        parts.append(f"\n{_RULE}\n")
         
-        return display
+        self._rendered_list = "".join(parts)
+        return self._rendered_list
     
-    def validate_template(self, template_content: str) -> bool:
+    def validate_template(self, template_content: Union[str, bytes]) -> bool:
         """
         Validate that template contains required placeholders
         
         Args:
-            template_content: HTML template content
+            template_content: HTML template content, or its raw bytes from
+                              load_template_bytes (scanned without decoding)
             
         Returns:
             True if template is valid, False otherwise
         """
-        required_placeholders = [
-            '{business_name}',
-            '{hero_headline}',
-            '{hero_subtext}',
-            '{services_html}',
-            '{contact_section}'
-        ]
-        
-        missing = []
-        for placeholder in required_placeholders:
-            if placeholder not in template_content:
-                missing.append(placeholder)
+        if isinstance(template_content, bytes):
+            found = {match.decode('ascii') for match in _REQUIRED_PLACEHOLDER_BYTES_RE.findall(template_content)}
+        else:
+            found = set(_REQUIRED_PLACEHOLDER_RE.findall(template_content))
+        missing = [placeholder for placeholder in REQUIRED_PLACEHOLDERS if placeholder not in found]
         
         if missing:
             print(f"Warning: Template missing placeholders: {', '.join(missing)}")